@@ -1,5 +1,8 @@
 import logging
+from dataclasses import dataclass
+from functools import cache, lru_cache
 
+from celery import Task
 from celery.states import READY_STATES
 from common.djangoapps.util.json_request import JsonResponse
 from django.contrib.auth.models import (
@@ -9,6 +12,7 @@ from django.core.exceptions import MultipleObjectsReturned
 from django.db import transaction
 from django.http.response import HttpResponseBadRequest, HttpResponseForbidden
 from django.utils.translation import gettext as _
+from django.utils.translation import gettext_noop
 from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_GET, require_POST
@@ -21,7 +25,6 @@ from lms.djangoapps.instructor.views.instructor_task_helpers import (
     extract_task_features,
 )
 from lms.djangoapps.instructor_task import api as task_api
-from lms.djangoapps.instructor_task.models import ReportStore
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
 from openedx.core.djangolib.markup import HTML, Text
@@ -42,6 +45,7 @@ from openedx_wikilearn_features.admin_dashboard.tasks import (
     task_user_pref_lang_report,
     task_users_enrollment_info_report,
 )
+from openedx_wikilearn_features.admin_dashboard.utils import get_report_links
 
 log = logging.getLogger(__name__)
 TASK_LOG = logging.getLogger("edx.celery.task")
@@ -50,6 +54,146 @@ SUCCESS_MESSAGE_TEMPLATE = _(
     "The {report_type} report is being created. To view the status of the report, see Pending Tasks below."
 )
 
+COURSE_VERSION_DETAILED_FEATURES = (
+    "course_id",
+    "course_title",
+    "course_language",
+    "version_type",
+    "total_active_enrolled",
+    "total_completion",
+    "completion_percent",
+    "average_grade",
+    "error_count",
+)
+COURSE_VERSION_AGGREGATE_FEATURES = (
+    "total_courses",
+    "course_ids",
+    "course_languages",
+    "total_active_enrolled",
+    "total_completion",
+    "completion_percent",
+    "average_grade",
+    "error_count",
+)
+ALL_COURSES_ENROLLMENT_FEATURES = (
+    "course_url",
+    "course_title",
+    "start_date",
+    "enrollment_date",
+    "archived_date",
+    "parent_course_url",
+    "parent_course_title",
+    "total_learners_enrolled",
+    "total_learners_completed",
+    "completed_percentage",
+    "total_cert_generated",
+)
+COURSES_ENROLLMENT_FEATURES = (
+    "course_id",
+    "base_course_id",
+    "course_title",
+    "course_language",
+    "student_username",
+    "date_enrolled",
+    "date_completed",
+    "cohort_enrollee",
+    "student_blocked",
+)
+USER_PREF_LANG_FEATURES = ("username", "dark_lang", "pref_lang")
+USERS_ENROLLMENT_FEATURES = ("username", "enrollments_count", "completions_count")
+ENROLLMENT_ACTIVITY_FEATURES = ("username", "course_title", "enrollment_date", "completion_date")
+
+# Fields read by `extract_task_features`; `requester` is rendered through its username.
+TASK_FEATURE_FIELDS = (
+    "task_type",
+    "task_input",
+    "task_id",
+    "task_state",
+    "task_output",
+    "created",
+    "requester__username",
+)
+
+
+@cache
+def _success_message(report_type):
+    """
+    Return the formatted success message for a report type label.
+    """
+    return SUCCESS_MESSAGE_TEMPLATE.format(report_type=report_type)
+
+
+@lru_cache(maxsize=1024)
+def _course_key(course_id):
+    """
+    Parse and cache the CourseKey for a raw course id string.
+    """
+    return CourseKey.from_string(course_id)
+
+
+@dataclass(frozen=True)
+class ReportSpec:
+    """
+    Describes a CSV report which is generated by submitting an AdminReportTask.
+
+    `csv_type` is marked with gettext_noop and translated when the report is submitted.
+    `report_label` is the report name shown in the success message.
+    `send_options` passes the request's POST data to the task as `options`.
+    """
+
+    task_class: Task
+    features: tuple
+    csv_type: str
+    report_label: str
+    send_options: bool = False
+
+
+REPORTS = {
+    "course_versions": ReportSpec(
+        task_course_version_report,
+        COURSE_VERSION_DETAILED_FEATURES,
+        "course_versions",
+        "Versions Detailed Report",
+    ),
+    "course_versions_aggregate": ReportSpec(
+        task_course_version_report,
+        COURSE_VERSION_AGGREGATE_FEATURES,
+        "course_versions_aggregate",
+        "Versions Aggregate Report",
+    ),
+    "all_courses_enrollment": ReportSpec(
+        task_all_courses_enrollment_report,
+        ALL_COURSES_ENROLLMENT_FEATURES,
+        gettext_noop("all_enrollments_stats"),
+        "All Courses enrollment Report",
+    ),
+    "courses_enrollment": ReportSpec(
+        task_courses_enrollment_report,
+        COURSES_ENROLLMENT_FEATURES,
+        gettext_noop("enrollment"),
+        "Courses enrollment Report",
+        send_options=True,
+    ),
+    "user_pref_lang": ReportSpec(
+        task_user_pref_lang_report,
+        USER_PREF_LANG_FEATURES,
+        gettext_noop("user_pref_lang"),
+        "Users Preferred Language Report",
+    ),
+    "users_enrollment": ReportSpec(
+        task_users_enrollment_info_report,
+        USERS_ENROLLMENT_FEATURES,
+        gettext_noop("all_users_enrollment"),
+        "Users Enrollments Report",
+    ),
+    "enrollment_activity": ReportSpec(
+        task_enrollment_activity_report,
+        ENROLLMENT_ACTIVITY_FEATURES,
+        gettext_noop("enrollment_acctivity_report"),
+        "User Enrollments Expanded Report",
+    ),
+}
+
 
 def require_course_permission(permission):
     """
@@ -65,14 +209,9 @@ def require_course_permission(permission):
         def wrapped(*args, **kwargs):
             request = args[0]
             courses = kwargs["course_id"].split(",")
-            for course in courses:
-                course_id = get_course_by_id(CourseKey.from_string(course))
-                if request.user.has_perm(permission, course_id):
-                    course_permission = True
-                else:
-                    return HttpResponseForbidden()
-            if course_permission:
-                return func(*args, **kwargs)
+            if not all(request.user.has_perm(permission, get_course_by_id(_course_key(course))) for course in courses):
+                return HttpResponseForbidden()
+            return func(*args, **kwargs)
 
         return wrapped
 
@@ -86,7 +225,6 @@ def common_exceptions_400(func):
     """
 
     def wrapped(request, *args, **kwargs):
-        use_json = request.is_ajax() or request.META.get("HTTP_ACCEPT", "").startswith("application/json")
         try:
             return func(request, *args, **kwargs)
         except User.DoesNotExist:
@@ -96,10 +234,7 @@ def common_exceptions_400(func):
         except (AlreadyRunningError, QueueConnectionError, AttributeError) as err:
             message = str(err)
 
-        if use_json:
-            return HttpResponseBadRequest(message)
-        else:
-            return HttpResponseBadRequest(message)
+        return HttpResponseBadRequest(message)
 
     return wrapped
 
@@ -116,7 +251,7 @@ def average_calculate_grades_csv(request, course_id):
     """
     report_type = _("grade")
     submit_average_calculate_grades_csv(request, course_id)
-    success_status = SUCCESS_MESSAGE_TEMPLATE.format(report_type=report_type)
+    success_status = _success_message(report_type)
 
     return JsonResponse({"status": success_status})
 
@@ -137,7 +272,7 @@ def progress_report_csv(request, course_id):
     """
     report_type = _("progress")
     submit_progress_report_csv(request, course_id)
-    success_status = SUCCESS_MESSAGE_TEMPLATE.format(report_type=report_type)
+    success_status = _success_message(report_type)
 
     return JsonResponse({"status": success_status})
 
@@ -153,36 +288,8 @@ def course_version_report(request, course_id):
     Handles request to generate CSV of base course versions info for all translated reruns.
     """
     report_type = request.POST.get("csv_type", "course_versions")
-    if report_type == "course_versions":
-        query_features = [
-            "course_id",
-            "course_title",
-            "course_language",
-            "version_type",
-            "total_active_enrolled",
-            "total_completion",
-            "completion_percent",
-            "average_grade",
-            "error_count",
-        ]
-        success_status = SUCCESS_MESSAGE_TEMPLATE.format(report_type="Versions Detailed Report")
-
-    else:
-        query_features = [
-            "total_courses",
-            "course_ids",
-            "course_languages",
-            "total_active_enrolled",
-            "total_completion",
-            "completion_percent",
-            "average_grade",
-            "error_count",
-        ]
-        success_status = SUCCESS_MESSAGE_TEMPLATE.format(report_type="Versions Aggregate Report")
-
-    submit_course_version_report(request, course_id, query_features, report_type)
-
-    return JsonResponse({"status": success_status})
+    spec_name = "course_versions" if report_type == "course_versions" else "course_versions_aggregate"
+    return submit_report(request, REPORTS[spec_name], course_id, report_type)
 
 
 @transaction.non_atomic_requests
@@ -193,25 +300,7 @@ def all_courses_enrollment_report(request):
     """
     Handles request to generate CSV of stats of all courses enrollments
     """
-    report_type = _("all_enrollments_stats")
-
-    success_status = SUCCESS_MESSAGE_TEMPLATE.format(report_type="All Courses enrollment Report")
-    query_features = [
-        "course_url",
-        "course_title",
-        "start_date",
-        "enrollment_date",
-        "archived_date",
-        "parent_course_url",
-        "parent_course_title",
-        "total_learners_enrolled",
-        "total_learners_completed",
-        "completed_percentage",
-        "total_cert_generated",
-    ]
-    submit_courses_enrollment_report(request, query_features, report_type, task_all_courses_enrollment_report)
-
-    return JsonResponse({"status": success_status})
+    return submit_report(request, REPORTS["all_courses_enrollment"])
 
 
 @transaction.non_atomic_requests
@@ -222,24 +311,7 @@ def courses_enrollment_report(request):
     """
     Handles request to generate CSV of stats of all courses enrollments.
     """
-    report_type = _("enrollment")
-
-    success_status = SUCCESS_MESSAGE_TEMPLATE.format(report_type="Courses enrollment Report")
-    query_features = [
-        "course_id",
-        "base_course_id",
-        "course_title",
-        "course_language",
-        "student_username",
-        "date_enrolled",
-        "date_completed",
-        "cohort_enrollee",
-        "student_blocked",
-    ]
-    options = request.POST
-    submit_courses_enrollment_report(request, query_features, report_type, task_courses_enrollment_report, options)
-
-    return JsonResponse({"status": success_status})
+    return submit_report(request, REPORTS["courses_enrollment"])
 
 
 @transaction.non_atomic_requests
@@ -250,15 +322,7 @@ def user_pref_lang_report(request):
     """
     Handles request to generate CSV of users preferred language.
     """
-    report_type = _("user_pref_lang")
-    success_status = SUCCESS_MESSAGE_TEMPLATE.format(report_type="Users Preferred Language Report")
-    task_input = {
-        "features": ["username", "dark_lang", "pref_lang"],
-        "csv_type": report_type,
-    }
-
-    submit_task(request, report_type, task_user_pref_lang_report, "all_courses", task_input, "")
-    return JsonResponse({"status": success_status})
+    return submit_report(request, REPORTS["user_pref_lang"])
 
 
 @transaction.non_atomic_requests
@@ -269,22 +333,7 @@ def users_enrollment_report(request):
     """
     Handles request to generate CSV of all users enrollments info.
     """
-    report_type = _("all_users_enrollment")
-    success_status = SUCCESS_MESSAGE_TEMPLATE.format(report_type="Users Enrollments Report")
-    task_input = {
-        "features": ["username", "enrollments_count", "completions_count"],
-        "csv_type": report_type,
-    }
-
-    submit_task(
-        request,
-        report_type,
-        task_users_enrollment_info_report,
-        "all_courses",
-        task_input,
-        "",
-    )
-    return JsonResponse({"status": success_status})
+    return submit_report(request, REPORTS["users_enrollment"])
 
 
 @transaction.non_atomic_requests
@@ -296,22 +345,7 @@ def enrollment_activity_report(request):
     Handles request to generate CSV of all users enrollments detailed info. This report has a separate row
     for each enrollment.
     """
-    report_type = _("enrollment_acctivity_report")
-    success_status = SUCCESS_MESSAGE_TEMPLATE.format(report_type="User Enrollments Expanded Report")
-    task_input = {
-        "features": ["username", "course_title", "enrollment_date", "completion_date"],
-        "csv_type": report_type,
-    }
-
-    submit_task(
-        request,
-        report_type,
-        task_enrollment_activity_report,
-        "all_courses",
-        task_input,
-        "",
-    )
-    return JsonResponse({"status": success_status})
+    return submit_report(request, REPORTS["enrollment_activity"])
 
 
 def submit_average_calculate_grades_csv(request, course_key):
@@ -338,25 +372,19 @@ def submit_progress_report_csv(request, course_id):
     return submit_task(request, task_type, task_class, course_id, task_input, task_key)
 
 
-def submit_course_version_report(request, course_key, features, task_type):
-    """
-    Submits a task to generate a CSV of translated versions report
+def submit_report(request, spec, course_id="all_courses", csv_type=None):
     """
-    task_class = task_course_version_report
-    task_input = {"features": features, "csv_type": task_type}
-    task_key = ""
-
-    return submit_task(request, task_type, task_class, course_key, task_input, task_key)
+    Submits the task described by a ReportSpec and returns the success response.
 
-
-def submit_courses_enrollment_report(request, features, task_type, task_class, options=None):
-    """
-    Submits a task to generate a CSV of all courses enrollments report
+    `csv_type` overrides the spec's (translated) csv_type, which is also used as the task type.
     """
-    task_input = {"features": features, "csv_type": task_type, "options": options}
-    task_key = ""
+    csv_type = csv_type or _(spec.csv_type)  # pylint: disable=translation-of-non-string
+    task_input = {"features": spec.features, "csv_type": csv_type}
+    if spec.send_options:
+        task_input["options"] = request.POST
 
-    return submit_task(request, task_type, task_class, "all_courses", task_input, task_key)
+    submit_task(request, csv_type, spec.task_class, course_id, task_input, "")
+    return JsonResponse({"status": _success_message(spec.report_label)})
 
 
 @require_GET
@@ -365,17 +393,26 @@ def pending_tasks(request, course_id=None):
     """
     Lists pending report tasks
     """
-    tasks = list(AdminReportTask.objects.filter(course_id=course_id).exclude(task_state__in=READY_STATES))
+    if not course_id:
+        # Every AdminReportTask has a course_id, so there is nothing to look up.
+        return JsonResponse([])
+
+    tasks = list(
+        AdminReportTask.objects.filter(course_id=course_id)
+        .exclude(task_state__in=READY_STATES)
+        .select_related("requester")
+        .only(*TASK_FEATURE_FIELDS)
+    )
     if "," not in course_id:
         #  InstructorTasks have course key objects, not comma-separated strings like AdminReportTasks
         try:
-            course_key = CourseKey.from_string(course_id)
-            instructor_tasks = list(task_api.get_running_instructor_tasks(course_key))
+            course_key = _course_key(course_id)
+            instructor_tasks = list(task_api.get_running_instructor_tasks(course_key).select_related("requester"))
             tasks += instructor_tasks
         except InvalidKeyError:
             pass
 
-    return JsonResponse(list(map(extract_task_features, tasks)))
+    return JsonResponse([extract_task_features(task) for task in tasks])
 
 
 @require_POST
@@ -397,7 +434,6 @@ def _list_all_courses_report_downloads(request):
 
     Internal function with common code shared between DRF and functional views.
     """
-    report_store = ReportStore.from_config(config_name="GRADES_DOWNLOAD")
     report_name = getattr(request, "query_params", request.POST).get("report_name", None)
 
     response_payload = {
@@ -407,7 +443,7 @@ def _list_all_courses_report_downloads(request):
                 url=url,
                 link=HTML('<a href="{}">{}</a>').format(HTML(url), Text(name)),
             )
-            for name, url in report_store.links_for("all_courses")
+            for name, url in get_report_links("all_courses")
             if report_name is None or name == report_name
         ]
     }
@@ -26,4 +26,7 @@ class AdminDashboardConfig(AppConfig):
     }
 
     def ready(self):
-        pass  # pylint: disable=unused-import
+        # Load the report views and tasks, along with the edx-platform modules they pull in, at startup
+        # instead of on the first request.
+        from . import course_reports, tasks  # pylint: disable=unused-import  # noqa: F401
+        from .admin_task import api  # pylint: disable=unused-import  # noqa: F401
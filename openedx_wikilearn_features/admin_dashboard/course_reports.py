@@ -4,6 +4,7 @@ Views for Course Reports
 
 import json
 from datetime import datetime
+from functools import cache, lru_cache
 
 from common.djangoapps.edxmako.shortcuts import render_to_response
 from common.djangoapps.util.cache import cache_if_anonymous
@@ -29,7 +30,7 @@ def require_user_permission():
     def decorator(func):
         def wrapped(*args):
             request = args[0]
-            if request.user.is_staff or request.user.is_superuser:
+            if _is_global_staff(request.user):
                 return func(*args)
             else:
                 return HttpResponseForbidden()
@@ -39,6 +40,59 @@ def require_user_permission():
     return decorator
 
 
+COURSE_ACCESS_ROLES = ("staff", "instructor")
+
+
+def _is_global_staff(user):
+    """
+    Return whether the user is global staff, who has access to every course.
+    """
+    return user.is_staff or user.is_superuser
+
+
+def _has_course_access(user, course):
+    """
+    Return whether the user has the 'staff' or 'instructor' role on the course.
+    """
+    return any(has_access(user, role, course) for role in COURSE_ACCESS_ROLES)
+
+
+def _first_accessible_course(user):
+    """
+    Return the first course the user has access to, without evaluating the rest of the courses.
+    """
+    if _is_global_staff(user):
+        return CourseOverview.objects.first()
+    for course in CourseOverview.objects.all().iterator(chunk_size=100):
+        if _has_course_access(user, course):
+            return course
+    return None
+
+
+def get_courses(user=None):
+    """
+    Retrieve a list of courses that a user has access to based on their permissions.
+
+    This function filters the list of all available courses to include only those
+    that the specified user has access to in the 'staff', 'instructor' or Global user role.
+
+    Args:
+        user (optional): The user for whom the course access is being checked.
+
+    Returns:
+        QuerySet | LazySequence: All courses for global staff, otherwise a lazily evaluated sequence
+                    of courses that the user has access to. No length estimate is given as the
+                    sequence is only ever iterated, which saves a COUNT query on every page load.
+    """
+    courses = CourseOverview.objects.all()
+    if _is_global_staff(user):
+        return courses
+    return LazySequence(
+        (c for c in courses if _has_course_access(user, c)),
+        est_len=0,
+    )
+
+
 # TODO: Uncomment and test after migrating meta_translations
 ## from openedx_wikilearn_features.meta_translations.models import CourseTranslation
 @login_required
@@ -46,36 +100,14 @@ def require_user_permission():
 @ensure_csrf_cookie
 @cache_if_anonymous()
 def course_reports(request):
-    courses_list = []
     sections = {"key": {}}
 
-    def get_courses(user=None):
-        """
-        Retrieve a list of courses that a user has access to based on their permissions.
-
-        This function filters the list of all available courses to include only those
-        that the specified user has access to in the 'staff', 'instructor' or Global user role.
-
-        Args:
-            user (optional): The user for whom the course access is being checked.
-
-        Returns:
-            LazySequence: A lazily evaluated sequence of courses that the user has access to.
-                        The sequence's length is estimated based on the total count of courses.
-        """
-        permissions = ["staff", "instructor"]
-        courses = CourseOverview.objects.all()
-        return LazySequence(
-            (c for c in courses if any(has_access(user, p, c) for p in permissions)),
-            est_len=courses.count(),
-        )
-
-    courses_list = get_courses(request.user)
-    course = get_course_by_id(courses_list[0].id, depth=0)
+    first_course = _first_accessible_course(request.user)
+    course = get_course_by_id(first_course.id, depth=0)
 
     access = {
         "admin": request.user.is_staff,
-        "instructor": bool(has_access(request.user, "instructor", courses_list[0])),
+        "instructor": bool(has_access(request.user, "instructor", first_course)),
     }
     sections["key"] = section_data_download(course, access)
 
@@ -89,42 +121,48 @@ def course_reports(request):
             # 'base_courses_list': json.dumps([str(course_id)
             #                                  for course_id in CourseTranslation.get_base_courses_list()]),
             "base_courses_list": json.dumps([]),
-            "courses": courses_list,
+            "courses": get_courses(request.user),
             "section_data": sections,
             "year_options": year_options,
         },
     )
 
 
+@lru_cache(maxsize=4096)
+def _reverse_course(name, course_key_str):
+    """
+    Reverse and cache a course scoped URL.
+    """
+    return reverse(name, kwargs={"course_id": course_key_str})
+
+
+@cache
+def _reverse(name):
+    """
+    Reverse and cache a URL which takes no arguments.
+    """
+    return reverse(name)
+
+
 def section_data_download(course, access):
     """Provide data for the corresponding dashboard section"""
-    course_key = course.id
+    course_key = str(course.id)
     section_data = {
         "access": access,
-        "get_students_features_url": reverse("get_students_features", kwargs={"course_id": str(course_key)}),
-        "list_report_downloads_url": reverse("list_report_downloads", kwargs={"course_id": str(course_key)}),
-        "calculate_grades_csv_url": reverse("calculate_grades_csv", kwargs={"course_id": str(course_key)}),
-        "problem_grade_report_url": reverse("problem_grade_report", kwargs={"course_id": str(course_key)}),
-        "get_anon_ids_url": reverse("get_anon_ids", kwargs={"course_id": str(course_key)}),
-        "get_students_who_may_enroll_url": reverse(
-            "get_students_who_may_enroll", kwargs={"course_id": str(course_key)}
-        ),
-        "average_calculate_grades_csv_url": reverse(
-            "admin_dashboard:average_calculate_grades_csv",
-            kwargs={"course_id": str(course_key)},
-        ),
-        "progress_report_csv_url": reverse(
-            "admin_dashboard:progress_report_csv", kwargs={"course_id": str(course_key)}
-        ),
-        "course_version_report_url": reverse(
-            "admin_dashboard:course_version_report",
-            kwargs={"course_id": str(course_key)},
-        ),
-        "courses_enrollments_csv_url": reverse("admin_dashboard:courses_enrollment_report"),
-        "all_courses_enrollments_csv_url": reverse("admin_dashboard:all_courses_enrollment_report"),
-        "user_pref_lang_csv_url": reverse("admin_dashboard:user_pref_lang_report"),
-        "users_enrollment_url": reverse("admin_dashboard:users_enrollment_report"),
-        "enrollment_activity_url": reverse("admin_dashboard:enrollment_activity_report"),
+        "get_students_features_url": _reverse_course("get_students_features", course_key),
+        "list_report_downloads_url": _reverse_course("list_report_downloads", course_key),
+        "calculate_grades_csv_url": _reverse_course("calculate_grades_csv", course_key),
+        "problem_grade_report_url": _reverse_course("problem_grade_report", course_key),
+        "get_anon_ids_url": _reverse_course("get_anon_ids", course_key),
+        "get_students_who_may_enroll_url": _reverse_course("get_students_who_may_enroll", course_key),
+        "average_calculate_grades_csv_url": _reverse_course("admin_dashboard:average_calculate_grades_csv", course_key),
+        "progress_report_csv_url": _reverse_course("admin_dashboard:progress_report_csv", course_key),
+        "course_version_report_url": _reverse_course("admin_dashboard:course_version_report", course_key),
+        "courses_enrollments_csv_url": _reverse("admin_dashboard:courses_enrollment_report"),
+        "all_courses_enrollments_csv_url": _reverse("admin_dashboard:all_courses_enrollment_report"),
+        "user_pref_lang_csv_url": _reverse("admin_dashboard:user_pref_lang_report"),
+        "users_enrollment_url": _reverse("admin_dashboard:users_enrollment_report"),
+        "enrollment_activity_url": _reverse("admin_dashboard:enrollment_activity_report"),
     }
     if not (access.get("data_researcher") or access.get("staff") or access.get("instructor")):
         section_data["is_hidden"] = True
@@ -1,25 +1,81 @@
-from datetime import datetime
-from time import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import chain
+from operator import itemgetter
+from time import monotonic, time
 
 from common.djangoapps.util.file import course_filename_prefix_generator
-from lms.djangoapps.instructor_analytics.csvs import format_dictlist
-from lms.djangoapps.instructor_task.models import ReportStore
 from lms.djangoapps.instructor_task.tasks_helper.runner import TaskProgress
 from lms.djangoapps.instructor_task.tasks_helper.utils import tracker_emit
 from opaque_keys.edx.keys import CourseKey
-from pytz import UTC
 
 from openedx_wikilearn_features.admin_dashboard.course_versions.utils import (
     get_last_quarter,
     get_quarter_dates,
-    list_all_courses_enrollment_data,
-    list_enrollment_activity,
-    list_quarterly_courses_enrollment_data,
-    list_user_pref_lang,
-    list_users_enrollments,
+    iter_all_courses_enrollment_data,
+    iter_enrollment_activity,
+    iter_quarterly_courses_enrollment_data,
+    iter_user_pref_lang,
+    iter_users_enrollments,
     list_version_report_info_per_course,
     list_version_report_info_total,
 )
+from openedx_wikilearn_features.admin_dashboard.utils import (
+    get_report_store,
+    invalidate_report_links,
+    report_filename,
+    serialize_csv,
+)
+
+
+class ProgressBuffer:
+    """
+    Coalesce intermediate TaskProgress step updates so they hit the result backend at most every `interval` seconds.
+
+    The first step is always written, and `flush` writes the latest step and returns the task progress.
+    """
+
+    def __init__(self, task_progress, interval=5.0):
+        self.task_progress = task_progress
+        self.interval = interval
+        self.current_step = None
+        self._last_flush = None
+
+    def set_step(self, step):
+        self.current_step = {"step": step}
+        if self._last_flush is None or monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = monotonic()
+        return self.task_progress.update_task_state(extra_meta=self.current_step)
+
+
+def _format_rows(data, features):
+    """
+    Lazily convert report dicts into CSV rows ordered by `features`.
+    """
+    if len(features) == 1:
+        (feature,) = features
+        return ([item[feature]] for item in data)
+    return map(list, map(itemgetter(*features), data))
+
+
+def _serialize_rows(header, rows):
+    """
+    Serialize `header` followed by `rows` and return the CSV buffer with the number of data rows written.
+    """
+    written = 0
+
+    def count_rows():
+        nonlocal written
+        for row in rows:
+            written += 1
+            yield row
+
+    buff = serialize_csv(chain([header], count_rows()))
+    return buff, written
 
 
 def upload_course_versions_csv(_xmodule_instance_args, _entry_id, course_id_str, task_input, action_name, user_ids):
@@ -34,11 +90,11 @@ def upload_course_versions_csv(_xmodule_instance_args, _entry_id, course_id_str,
         information of all translated reruns.
     """
     start_time = time()
-    start_date = datetime.now(UTC)
+    start_date = datetime.now(timezone.utc)
     num_reports = 1
     task_progress = TaskProgress(action_name, num_reports, start_time)
-    current_step = {"step": "Calculating version"}
-    task_progress.update_task_state(extra_meta=current_step)
+    progress = ProgressBuffer(task_progress)
+    progress.set_step("Calculating version")
 
     # Compute result table and format it
     query_features = task_input.get("features")
@@ -74,26 +130,23 @@ def upload_course_versions_csv(_xmodule_instance_args, _entry_id, course_id_str,
         data, error_data = list_version_report_info_total(course_key)
         is_per_course_report = False
 
-    header, rows = format_dictlist(data, query_features)
+    rows = list(_format_rows(data, query_features))
+    error_rows = list(_format_rows(error_data, ["course_id", "user_id", "user_name", "error"]))
+
+    progress.set_step("Uploading CSV")
 
-    error_rows = []
-    if error_data:
-        error_header, error_rows = format_dictlist(error_data, ["course_id", "user_id", "user_name", "error"])
+    # Perform the upload
+    upload_course_versions_csv_to_report_store(
+        chain([query_features_names], rows), error_rows, course_key, start_date, is_per_course_report
+    )
 
+    # The counts are only written with the final state
     task_progress.succeeded = len(rows)
     task_progress.failed = len(error_rows)
     task_progress.attempted = task_progress.succeeded + task_progress.failed
     task_progress.skipped = task_progress.total - task_progress.attempted
 
-    rows.insert(0, query_features_names)
-
-    current_step = {"step": "Uploading CSV"}
-    task_progress.update_task_state(extra_meta=current_step)
-
-    # Perform the upload
-    upload_course_versions_csv_to_report_store(rows, error_rows, course_key, start_date, is_per_course_report)
-
-    return task_progress.update_task_state(extra_meta=current_step)
+    return progress.flush()
 
 
 def upload_course_versions_csv_to_report_store(
@@ -108,181 +161,168 @@ def upload_course_versions_csv_to_report_store(
     Upload credits data as a CSV using ReportStore. It will not append given base course name in generated filename.
     It will also generates Error report along with versions report if any grade error will occur.
     Arguments:
-        rows: CSV data in the following format (first column may be a
+        rows: iterable of CSV rows in the following format (first row may be a
             header):
             [
                 [row1_colum1, row1_colum2, ...],
                 ...
             ]
-        error_rows: list pf dict contsing information about grade errors
-            i.e [{'course_id_1', 'user_id_1', 'dummy', 'reason of error'}]
+        error_rows: iterable of rows containing information about grade errors, without header
+            i.e [['course_id_1', 'user_id_1', 'dummy', 'reason of error']]
         course_key: Base course id
         timestramp: current timestramp
         is_per_course_report: Boolean value indicating if report is detailed one or aggregate one
     """
-    report_store = ReportStore.from_config(config_name)
+    report_store = get_report_store(config_name)
 
     csv_name = "versions_info_detailed" if is_per_course_report else "versions_info_total"
-    report_name = "{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-        course_prefix=course_filename_prefix_generator(course_key),
-        csv_name=csv_name,
-        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M"),
-    )
-    report_store.store_rows(str(course_key), report_name, rows)
+    course_prefix = course_filename_prefix_generator(course_key)
+    report_name = report_filename(f"{course_prefix}_{csv_name}_{timestamp:%Y-%m-%d-%H%M}")
+    report_store.store(str(course_key), report_name, serialize_csv(rows))
 
     if error_rows:
         report_name = "ERRORS_" + report_name
-        error_rows.insert(0, ["Course ID", "User ID", "Username", "Error"])
-        report_store.store_rows(str(course_key), report_name, error_rows)
+        report_store.store(
+            str(course_key),
+            report_name,
+            serialize_csv(chain([["Course ID", "User ID", "Username", "Error"]], error_rows)),
+        )
+    invalidate_report_links(str(course_key), config_name)
     tracker_emit(csv_name)
 
 
-def upload_all_courses_enrollment_csv(
-    _xmodule_instance_args, _entry_id, course_id_str, task_input, action_name, user_ids
-):
+def _report_quarter(task_input):
     """
-    Generate a CSV file containing information of all courses enrollments.
+    Return the quarter requested in the task options, defaulting to the last quarter.
     """
-    start_time = time()
-    start_date = datetime.now(UTC)
-    num_reports = 1
-    task_progress = TaskProgress(action_name, num_reports, start_time)
-    current_step = {"step": "Calculating All Courses Enrollment Stats"}
-    task_progress.update_task_state(extra_meta=current_step)
-
-    # Compute result table and format it
-    query_features = task_input.get("features")
-
-    query_features_names = [
-        "Course URL",
-        "Course title",
-        "Start Date",
-        "Enrollment Date",
-        "Course Archived Date",
-        "Parent course URL",
-        "Parent course title",
-        "Total learners enrolled",
-        "Total learners completed",
-        "Percentage of learners who completed the course",
-        "Certificates Generated",
-    ]
-    data = list_all_courses_enrollment_data()
-
-    header, rows = format_dictlist(data, query_features)
-
-    task_progress.attempted = task_progress.succeeded = len(rows)
-    task_progress.skipped = task_progress.total - task_progress.attempted
-
-    rows.insert(0, query_features_names)
-
-    current_step = {"step": "Uploading CSV"}
-    task_progress.update_task_state(extra_meta=current_step)
-
-    # Perform the upload
-    report_store = ReportStore.from_config("GRADES_DOWNLOAD")
+    options = task_input.get("options", {})
+    if options["year"] and options["quarter"]:
+        return get_quarter_dates(options["year"], options["quarter"])
+    return get_last_quarter()
 
-    csv_name = "all_courses_enrollments"
-    report_name = "{csv_name}_{timestamp_str}.csv".format(
-        csv_name=csv_name, timestamp_str=start_date.strftime("%Y-%m-%d-%H%M")
-    )
-    report_store.store_rows(course_id_str, report_name, rows)
 
-    return task_progress.update_task_state(extra_meta=current_step)
+@dataclass(frozen=True)
+class CsvReportSpec:
+    """
+    Everything that differs between the streamed admin CSV reports.
 
+    `data` and `csv_name` are called with the task input.
+    """
 
-def upload_quarterly_courses_enrollment_csv(
-    _xmodule_instance_args, _entry_id, course_id_str, task_input, action_name, user_ids
-):
+    step: str
+    header: tuple
+    data: Callable[[dict], Iterable[dict]]
+    csv_name: Callable[[dict], str]
+
+
+CSV_REPORTS = {
+    "all_courses_enrollments": CsvReportSpec(
+        step="Calculating All Courses Enrollment Stats",
+        header=(
+            "Course URL",
+            "Course title",
+            "Start Date",
+            "Enrollment Date",
+            "Course Archived Date",
+            "Parent course URL",
+            "Parent course title",
+            "Total learners enrolled",
+            "Total learners completed",
+            "Percentage of learners who completed the course",
+            "Certificates Generated",
+        ),
+        data=lambda task_input: iter_all_courses_enrollment_data(),
+        csv_name=lambda task_input: "all_courses_enrollments",
+    ),
+    "courses_enrollments": CsvReportSpec(
+        step="Calculating version",
+        header=(
+            "Course ID",
+            "Base Course ID",
+            "Course Title",
+            "Course Language",
+            "Username",
+            "Date Enrolled",
+            "Date Completed",
+            "Cohort Enrollee",
+            "Student Blocked",
+        ),
+        data=lambda task_input: iter_quarterly_courses_enrollment_data(_report_quarter(task_input)),
+        csv_name=lambda task_input: "courses_enrollments({}-{})".format(*_report_quarter(task_input)),
+    ),
+    "user_pref_lang": CsvReportSpec(
+        step="Getting User preferences",
+        header=("Username", "Selected Language", "Preferred Language"),
+        data=lambda task_input: iter_user_pref_lang(),
+        csv_name=lambda task_input: "user_pref_lang",
+    ),
+    "users_enrollment_info": CsvReportSpec(
+        step="Getting Users profile info",
+        header=("Username", "Enrollments", "Courses Completed"),
+        data=lambda task_input: iter_users_enrollments(),
+        csv_name=lambda task_input: task_input.get("csv_type"),
+    ),
+    "enrollment_activity": CsvReportSpec(
+        step="Getting enrollments",
+        header=("User", "Course Title", "Enrollment Date", "Completion Date"),
+        data=lambda task_input: iter_enrollment_activity(),
+        csv_name=lambda task_input: task_input.get("csv_type"),
+    ),
+}
+
+
+def _run_csv_report(spec, course_id_str, task_input, action_name):
     """
-    Generate a CSV file containing information of quarterly courses enrollments.
+    Generate the CSV report described by `spec` and upload it to the report store.
     """
     start_time = time()
-    start_date = datetime.now(UTC)
+    start_date = datetime.now(timezone.utc)
     num_reports = 1
     task_progress = TaskProgress(action_name, num_reports, start_time)
-    current_step = {"step": "Calculating version"}
-    task_progress.update_task_state(extra_meta=current_step)
+    progress = ProgressBuffer(task_progress)
+    progress.set_step(spec.step)
 
-    # Compute result table and format it
-    query_features = task_input.get("features")
-    options = task_input.get("options", {})
+    # Rows are computed lazily while they are serialized
+    rows = _format_rows(spec.data(task_input), task_input.get("features"))
+    buff, written = _serialize_rows(spec.header, rows)
 
-    query_features_names = [
-        "Course ID",
-        "Base Course ID",
-        "Course Title",
-        "Course Language",
-        "Username",
-        "Date Enrolled",
-        "Date Completed",
-        "Cohort Enrollee",
-        "Student Blocked",
-    ]
-    if options["year"] and options["quarter"]:
-        quarter = get_quarter_dates(options["year"], options["quarter"])
-    else:
-        quarter = get_last_quarter()
+    progress.set_step("Uploading CSV")
 
-    data = list_quarterly_courses_enrollment_data(quarter)
-
-    header, rows = format_dictlist(data, query_features)
+    # Perform the upload
+    report_name = report_filename(f"{spec.csv_name(task_input)}_{start_date:%Y-%m-%d-%H%M}")
+    get_report_store("GRADES_DOWNLOAD").store(course_id_str, report_name, buff)
+    invalidate_report_links(course_id_str)
 
-    task_progress.attempted = task_progress.succeeded = len(rows)
+    # The counts are only written with the final state
+    task_progress.attempted = task_progress.succeeded = written
     task_progress.skipped = task_progress.total - task_progress.attempted
 
-    rows.insert(0, query_features_names)
+    return progress.flush()
 
-    current_step = {"step": "Uploading CSV"}
-    task_progress.update_task_state(extra_meta=current_step)
 
-    # Perform the upload
-    report_store = ReportStore.from_config("GRADES_DOWNLOAD")
-    csv_name = f"courses_enrollments({quarter[0]}-{quarter[1]})"
-    report_name = "{csv_name}_{timestamp_str}.csv".format(
-        csv_name=csv_name, timestamp_str=start_date.strftime("%Y-%m-%d-%H%M")
-    )
-    report_store.store_rows(course_id_str, report_name, rows)
+def upload_all_courses_enrollment_csv(
+    _xmodule_instance_args, _entry_id, course_id_str, task_input, action_name, user_ids
+):
+    """
+    Generate a CSV file containing information of all courses enrollments.
+    """
+    return _run_csv_report(CSV_REPORTS["all_courses_enrollments"], course_id_str, task_input, action_name)
+
 
-    return task_progress.update_task_state(extra_meta=current_step)
+def upload_quarterly_courses_enrollment_csv(
+    _xmodule_instance_args, _entry_id, course_id_str, task_input, action_name, user_ids
+):
+    """
+    Generate a CSV file containing information of quarterly courses enrollments.
+    """
+    return _run_csv_report(CSV_REPORTS["courses_enrollments"], course_id_str, task_input, action_name)
 
 
 def upload_user_pref_lang_csv(_xmodule_instance_args, _entry_id, course_id_str, task_input, action_name, user_ids):
     """
     Generate a CSV file containing information of users preferred language.
     """
-    start_time = time()
-    start_date = datetime.now(UTC)
-    num_reports = 1
-    task_progress = TaskProgress(action_name, num_reports, start_time)
-    current_step = {"step": "Getting User preferences"}
-    task_progress.update_task_state(extra_meta=current_step)
-
-    # Compute result table and format it
-    query_features = task_input.get("features")
-
-    query_features_names = ["Username", "Selected Language", "Preferred Language"]
-
-    data = list_user_pref_lang()
-
-    header, rows = format_dictlist(data, query_features)
-
-    task_progress.attempted = task_progress.succeeded = len(rows)
-    task_progress.skipped = task_progress.total - task_progress.attempted
-
-    rows.insert(0, query_features_names)
-
-    current_step = {"step": "Uploading CSV"}
-    task_progress.update_task_state(extra_meta=current_step)
-
-    # Perform the upload
-    report_store = ReportStore.from_config("GRADES_DOWNLOAD")
-    csv_name = f"user_pref_lang"
-    report_name = "{csv_name}_{timestamp_str}.csv".format(
-        csv_name=csv_name, timestamp_str=start_date.strftime("%Y-%m-%d-%H%M")
-    )
-    report_store.store_rows(course_id_str, report_name, rows)
-
-    return task_progress.update_task_state(extra_meta=current_step)
+    return _run_csv_report(CSV_REPORTS["user_pref_lang"], course_id_str, task_input, action_name)
 
 
 def upload_users_enrollment_info_csv(
@@ -291,78 +331,11 @@ def upload_users_enrollment_info_csv(
     """
     Generate a CSV file containing information of users enrollments and course completions.
     """
-    start_time = time()
-    start_date = datetime.now(UTC)
-    num_reports = 1
-    task_progress = TaskProgress(action_name, num_reports, start_time)
-    current_step = {"step": "Getting Users profile info"}
-    task_progress.update_task_state(extra_meta=current_step)
-
-    # Compute result table and format it
-    query_features = task_input.get("features")
-
-    query_features_names = ["Username", "Enrollments", "Courses Completed"]
-
-    data = list_users_enrollments()
-    __, rows = format_dictlist(data, query_features)
-
-    task_progress.attempted = task_progress.succeeded = len(rows)
-    task_progress.skipped = task_progress.total - task_progress.attempted
-
-    rows.insert(0, query_features_names)
-
-    current_step = {"step": "Uploading CSV"}
-    task_progress.update_task_state(extra_meta=current_step)
-
-    # Perform the upload
-    report_store = ReportStore.from_config("GRADES_DOWNLOAD")
-    csv_name = task_input.get("csv_type")
-    report_name = "{csv_name}_{timestamp_str}.csv".format(
-        csv_name=csv_name, timestamp_str=start_date.strftime("%Y-%m-%d-%H%M")
-    )
-    report_store.store_rows(course_id_str, report_name, rows)
-
-    return task_progress.update_task_state(extra_meta=current_step)
+    return _run_csv_report(CSV_REPORTS["users_enrollment_info"], course_id_str, task_input, action_name)
 
 
 def upload_enrollment_activity_csv(_xmodule_instance_args, _entry_id, course_id_str, task_input, action_name, user_ids):
     """
     Generate a CSV file containing information of course enrollments and completion dates.
     """
-    start_time = time()
-    start_date = datetime.now(UTC)
-    num_reports = 1
-    task_progress = TaskProgress(action_name, num_reports, start_time)
-    current_step = {"step": "Getting enrollments"}
-    task_progress.update_task_state(extra_meta=current_step)
-
-    # Compute result table and format it
-    query_features = task_input.get("features")
-
-    query_features_names = [
-        "User",
-        "Course Title",
-        "Enrollment Date",
-        "Completion Date",
-    ]
-
-    data = list_enrollment_activity()
-    __, rows = format_dictlist(data, query_features)
-
-    task_progress.attempted = task_progress.succeeded = len(rows)
-    task_progress.skipped = task_progress.total - task_progress.attempted
-
-    rows.insert(0, query_features_names)
-
-    current_step = {"step": "Uploading CSV"}
-    task_progress.update_task_state(extra_meta=current_step)
-
-    # Perform the upload
-    report_store = ReportStore.from_config("GRADES_DOWNLOAD")
-    csv_name = task_input.get("csv_type")
-    report_name = "{csv_name}_{timestamp_str}.csv".format(
-        csv_name=csv_name, timestamp_str=start_date.strftime("%Y-%m-%d-%H%M")
-    )
-    report_store.store_rows(course_id_str, report_name, rows)
-
-    return task_progress.update_task_state(extra_meta=current_step)
+    return _run_csv_report(CSV_REPORTS["enrollment_activity"], course_id_str, task_input, action_name)
@@ -1,12 +1,13 @@
-import calendar
+from collections import defaultdict
 from datetime import date
+from functools import lru_cache, wraps
 from logging import getLogger
 
 from common.djangoapps.student.models import CourseEnrollment
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import OuterRef, Subquery, TextField, Value
-from django.db.models.functions import Coalesce
+from django.core.cache import cache
+from django.db.models import Prefetch
 from django.test import RequestFactory
 from edx_proctoring.api import get_last_exam_completion_date
 from lms.djangoapps.courseware.courses import get_course_by_id
@@ -18,9 +19,10 @@ from openedx.core.djangoapps.content.course_overviews.models import CourseOvervi
 from openedx.core.djangoapps.dark_lang import DARK_LANGUAGE_KEY
 from openedx.core.djangoapps.lang_pref import LANGUAGE_KEY
 from openedx.core.djangoapps.user_api.models import UserPreference
+from openedx.features.course_experience.utils import get_course_outline_block_tree
 
 from openedx_wikilearn_features.wikimedia_general.utils import (
-    get_course_completion_date,
+    get_course_completion_dates,
     get_course_enrollment_and_completion_stats,
     get_user_course_completions,
 )
@@ -28,6 +30,87 @@ from openedx_wikilearn_features.wikimedia_general.utils import (
 log = getLogger(__name__)
 User = get_user_model()
 
+VERSION_REPORT_CACHE_TIMEOUT = 60 * 60
+
+# Month-day bounds of each yearly quarter
+QUARTER_BOUNDS = {
+    1: ("01-01", "03-31"),
+    2: ("04-01", "06-30"),
+    3: ("07-01", "09-30"),
+    4: ("10-01", "12-31"),
+}
+
+
+def cached_report(timeout=VERSION_REPORT_CACHE_TIMEOUT):
+    """
+    Cache the result of a report builder in the django cache for `timeout` seconds, keyed on its arguments.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            key = "admin_dashboard.{}:{}".format(func.__name__, ":".join(map(str, args)))
+            return cache.get_or_set(key, lambda: func(*args), timeout)
+
+        return wrapper
+
+    return decorator
+
+
+@lru_cache(maxsize=None)
+def _report_request():
+    """
+    Return the dummy request passed to `get_course_outline_block_tree` by the version reports, which only read it.
+    """
+    return RequestFactory().get("/")
+
+
+@cached_report()
+def get_course_version_stats(course_key):
+    """
+    Compute enrollment, completion and grade stats of a single course version in one CourseGradeFactory pass.
+
+    Returns the stats dict and a list of grade error dicts. Shared by the detailed and aggregate version reports,
+    so generating both only grades each course once per VERSION_REPORT_CACHE_TIMEOUT.
+    """
+    error_data = []
+    course = get_course_by_id(course_key)
+    # Only counts and sums are taken from the learners, so no ordering is needed.
+    enrollments = CourseEnrollment.objects.filter(course_id=course_key, is_active=True).select_related("user")
+    users = [enrollment.user for enrollment in enrollments]
+    stats = {
+        "course_id": str(course_key),
+        "course_title": course.display_name,
+        "course_language": course.language,
+        "total_active_enrolled": len(users),
+        "total_completion": 0,
+        "total_students_with_no_errors": 0,
+        "sum_grade_percent": 0,
+        "error_count": 0,
+    }
+
+    request = _report_request()
+    for student, course_grade, error in CourseGradeFactory().iter(users=users, course_key=course_key):
+        course_blocks = get_course_outline_block_tree(request, str(course_key), student)
+        if course_blocks.get("complete"):
+            stats["total_completion"] += 1
+
+        if error is not None:
+            error_data.append(
+                {
+                    "course_id": str(course_key),
+                    "user_id": student.id,
+                    "user_name": student.username,
+                    "error": str(error),
+                }
+            )
+            stats["error_count"] += 1
+        else:
+            stats["total_students_with_no_errors"] += 1
+            stats["sum_grade_percent"] += course_grade.percent
+
+    return stats, error_data
+
 
 def list_version_report_info_per_course(course_key):
     """
@@ -56,51 +139,24 @@ def list_version_report_info_per_course(course_key):
     error_data = []
 
     def update_report_data(course_key, course_type):
-        from openedx.features.course_experience.utils import (
-            get_course_outline_block_tree,
-        )
+        stats, errors = get_course_version_stats(course_key)
+        error_data.extend(errors)
 
-        nonlocal error_data, versions_data
-        sum_grade_percent = 0
-        error_count = 0
-        enrollments = CourseEnrollment.objects.filter(course_id=course_key, is_active=True).order_by("created")
-        users = [enrollment.user for enrollment in enrollments]
-        total_enrollments = len(users)
-        total_students_with_no_errors = 0
-        completion_count = 0
-        request = RequestFactory().get("/")
-        course = get_course_by_id(course_key)
-        for student, course_grade, error in CourseGradeFactory().iter(users=users, course_key=course_key):
-            course_blocks = get_course_outline_block_tree(request, str(course_key), student)
-            if course_blocks.get("complete"):
-                completion_count += 1
-
-            if error is not None:
-                error_data.append(
-                    {
-                        "course_id": str(course_key),
-                        "user_id": student.id,
-                        "user_name": student.username,
-                        "error": str(error),
-                    }
-                )
-                error_count += 1
-            else:
-                total_students_with_no_errors += 1
-                sum_grade_percent += course_grade.percent
-
-        average_grade = total_students_with_no_errors and (sum_grade_percent / total_students_with_no_errors)
+        total_enrollments = stats["total_active_enrolled"]
+        completion_count = stats["total_completion"]
+        total_students_with_no_errors = stats["total_students_with_no_errors"]
+        average_grade = total_students_with_no_errors and (stats["sum_grade_percent"] / total_students_with_no_errors)
         versions_data.append(
             {
-                "course_id": str(course_key),
-                "course_title": course.display_name,
-                "course_language": course.language,
+                "course_id": stats["course_id"],
+                "course_title": stats["course_title"],
+                "course_language": stats["course_language"],
                 "version_type": course_type,
                 "total_active_enrolled": total_enrollments,
                 "total_completion": completion_count,
                 "completion_percent": total_enrollments and completion_count / total_enrollments,
                 "average_grade": average_grade,
-                "error_count": error_count,
+                "error_count": stats["error_count"],
             }
         )
 
@@ -149,41 +205,20 @@ def list_version_report_info_total(course_key):
     }
 
     def update_report_data_with_details(course_key):
-        from openedx.features.course_experience.utils import (
-            get_course_outline_block_tree,
-        )
+        stats, errors = get_course_version_stats(course_key)
+        error_data.extend(errors)
 
-        request = RequestFactory().get("/")
-
-        nonlocal error_data, course_ids, course_languages, report
         report["total_courses"] += 1
-        course_ids.append(str(course_key))
-
-        course = get_course_by_id(course_key)
-        course_languages.append(str(course.language))
-
-        enrollments = CourseEnrollment.objects.filter(course_id=course_key, is_active=True).order_by("created")
-        users = [enrollment.user for enrollment in enrollments]
-        report["total_active_enrolled"] += len(users)
-
-        for student, course_grade, error in CourseGradeFactory().iter(users=users, course_key=course_key):
-            course_blocks = get_course_outline_block_tree(request, str(course_key), student)
-            if course_blocks.get("complete"):
-                report["total_completion"] += 1
-
-            if error is not None:
-                error_data.append(
-                    {
-                        "course_id": str(course_key),
-                        "user_id": student.id,
-                        "user_name": student.username,
-                        "error": str(error),
-                    }
-                )
-                report["error_count"] += 1
-            else:
-                report["total_students_with_no_errors"] += 1
-                report["sum_grade_percent"] += course_grade.percent
+        course_ids.append(stats["course_id"])
+        course_languages.append(str(stats["course_language"]))
+        for key in (
+            "total_active_enrolled",
+            "total_completion",
+            "total_students_with_no_errors",
+            "sum_grade_percent",
+            "error_count",
+        ):
+            report[key] += stats[key]
 
     # TODO: Uncomment and test after migrating meta_translations
     # course_translation = CourseTranslation.objects.filter(base_course_id=course_key)
@@ -209,64 +244,48 @@ def list_version_report_info_total(course_key):
 
 def get_quarter_dates(year, quarter):
     """Returns the start and end date of the given quarter"""
-    year, quarter = int(year), int(quarter)
-
-    date_format = "%Y-%m-%d"
-
-    start_month = (quarter * 3) - 2
-    start = date(year, start_month, 1)
-
-    last_month = start_month + 2
-    last_day = calendar.monthrange(year, last_month)[-1]
-    end = date(year, last_month, last_day)
-
-    return [start.strftime(date_format), end.strftime(date_format)]
+    year = int(year)
+    start, end = QUARTER_BOUNDS[int(quarter)]
+    return [f"{year}-{start}", f"{year}-{end}"]
 
 
 def get_last_quarter():
     """Returns the start and end date of the last yearly quarter"""
     ref = date.today()
-    date_format = "%Y-%m-%d"
-    if ref.month < 4:
-        return [
-            date(ref.year - 1, 10, 1).strftime(date_format),
-            date(ref.year - 1, 12, 31).strftime(date_format),
-        ]
-    elif ref.month < 7:
-        return [
-            date(ref.year, 1, 1).strftime(date_format),
-            date(ref.year, 3, 31).strftime(date_format),
-        ]
-    elif ref.month < 10:
-        return [
-            date(ref.year, 4, 1).strftime(date_format),
-            date(ref.year, 6, 30).strftime(date_format),
-        ]
-    return [
-        date(ref.year, 7, 1).strftime(date_format),
-        date(ref.year, 9, 30).strftime(date_format),
-    ]
+    last_quarter = (ref.month - 1) // 3
+    if last_quarter == 0:
+        return get_quarter_dates(ref.year - 1, 4)
+    return get_quarter_dates(ref.year, last_quarter)
+
+
+@lru_cache(maxsize=None)
+def _cms_course_url_prefix():
+    """
+    Studio course url prefix, CMS_BASE does not change at runtime.
+    """
+    return f"https://{settings.CMS_BASE}/course/"
 
 
 def get_cms_course_url(course_key):
     """
     Get course url for studio
     """
-    return f"https://{settings.CMS_BASE}/course/{course_key}"
+    return f"{_cms_course_url_prefix()}{course_key}"
 
 
-def list_all_courses_enrollment_data():
+def iter_all_courses_enrollment_data():
     """
-    Get all courses enrollment report
+    Yield all courses enrollment report rows
     """
 
-    courses = CourseOverview.objects.all()
-    courses_data = []
+    courses = CourseOverview.objects.only("id", "display_name", "start", "enrollment_start", "end").iterator(
+        chunk_size=200
+    )
 
     for course in courses:
         parent_course_url = ""
         parent_course_title = ""
-        log.info(f"Processing data for course with course ID {course.id}:")
+        log.debug("Processing data for course with course ID %s:", course.id)
 
         # TODO: Uncomment and test after migrating meta_translations
         # try:
@@ -287,66 +306,98 @@ def list_all_courses_enrollment_data():
             log.info(f"Skipping course ID {course.id} due to the above error.")
             continue
 
-        # Append outside the try block
-        courses_data.append(
-            {
-                "course_url": get_cms_course_url(str(course.id)),
-                "course_title": course.display_name,
-                "start_date": course.start.strftime("%Y-%m-%d") if course.start else "",
-                "enrollment_date": (course.enrollment_start.strftime("%Y-%m-%d") if course.enrollment_start else ""),
-                "archived_date": (course.end.strftime("%Y-%m-%d") if course.has_ended() else ""),
-                "parent_course_url": parent_course_url,
-                "parent_course_title": parent_course_title,
-                "total_learners_enrolled": course_completion_stats["total_learners_enrolled"],
-                "total_learners_completed": course_completion_stats["total_learners_completed"],
-                "completed_percentage": course_completion_stats["completed_percentage"],
-                "total_cert_generated": course_completion_stats["total_cert_generated"],
-            }
+        # Yield outside the try block
+        yield {
+            "course_url": get_cms_course_url(str(course.id)),
+            "course_title": course.display_name,
+            "start_date": course.start.strftime("%Y-%m-%d") if course.start else "",
+            "enrollment_date": (course.enrollment_start.strftime("%Y-%m-%d") if course.enrollment_start else ""),
+            "archived_date": (course.end.strftime("%Y-%m-%d") if course.has_ended() else ""),
+            "parent_course_url": parent_course_url,
+            "parent_course_title": parent_course_title,
+            "total_learners_enrolled": course_completion_stats["total_learners_enrolled"],
+            "total_learners_completed": course_completion_stats["total_learners_completed"],
+            "completed_percentage": course_completion_stats["completed_percentage"],
+            "total_cert_generated": course_completion_stats["total_cert_generated"],
+        }
+
+
+def list_all_courses_enrollment_data():
+    """
+    Get all courses enrollment report
+    """
+    return list(iter_all_courses_enrollment_data())
+
+
+def iter_quarterly_courses_enrollment_data(quarter):
+    """
+    Yield course enrollment rows for the given quarter
+    """
+    # One query over all courses, joining the user and course overview columns the report needs.
+    # Ordered so the CSV lists each course's enrollments together, in enrollment order.
+    enrollments = (
+        CourseEnrollment.objects.filter(created__range=quarter, is_active=True)
+        .order_by("course_id", "created")
+        .values_list(
+            "course_id",
+            "created",
+            "user__username",
+            "user__is_active",
+            "course__display_name",
+            "course__language",
+            "course__self_paced",
         )
+    )
 
-    return courses_data
+    base_course_id = ""
+    # TODO: Uncomment and test after migrating meta_translations
+    # try:
+    #     course_traslation = CourseTranslation.objects.get(course_id=course.id)
+    #     base_course_id = str(course_traslation.base_course_id)
+    # except CourseTranslation.DoesNotExist:
+    #     pass
+
+    for course_id, created, username, user_is_active, course_title, language, self_paced in enrollments.iterator():
+        completion_date = get_last_exam_completion_date(course_id, username)
+        yield {
+            "course_id": str(course_id),
+            "base_course_id": str(base_course_id),
+            "course_title": course_title,
+            "course_language": language,
+            "student_username": username,
+            "date_enrolled": created.strftime("%Y-%m-%d"),
+            "date_completed": (completion_date.strftime("%Y-%m-%d") if completion_date else ""),
+            "cohort_enrollee": "N" if self_paced else "Y",
+            "student_blocked": "N" if user_is_active else "Y",
+        }
 
 
 def list_quarterly_courses_enrollment_data(quarter):
     """
     Get course reports
     """
-    courses_data = []
-    courses = CourseOverview.objects.all()
-    for course in courses:
-        enrollments = CourseEnrollment.objects.filter(
-            created__range=quarter,
-            course_id=course.id,
-            is_active=True,
-        ).order_by("created")
-
-        language = get_course_by_id(course.id).language
-        base_course_id = ""
-        # TODO: Uncomment and test after migrating meta_translations
-        # try:
-        #     course_traslation = CourseTranslation.objects.get(course_id=course.id)
-        #     base_course_id = str(course_traslation.base_course_id)
-        # except CourseTranslation.DoesNotExist:
-        #     pass
+    return list(iter_quarterly_courses_enrollment_data(quarter))
 
-        for enrollment in enrollments:
-            user = User.objects.get(id=enrollment.user_id)
-            username = user.get_username()
-            completion_date = get_last_exam_completion_date(course.id, username)
-            courses_data.append(
-                {
-                    "course_id": str(course.id),
-                    "base_course_id": str(base_course_id),
-                    "course_title": course.display_name,
-                    "course_language": language,
-                    "student_username": username,
-                    "date_enrolled": enrollment.created.strftime("%Y-%m-%d"),
-                    "date_completed": (completion_date.strftime("%Y-%m-%d") if completion_date else ""),
-                    "cohort_enrollee": "N" if course.self_paced else "Y",
-                    "student_blocked": "N" if user.is_active else "Y",
-                }
-            )
-    return courses_data
+
+def iter_user_pref_lang():
+    """
+    Yield the preferred language of all users, see `list_user_pref_lang`.
+    """
+    # One sweep over both language preferences, joined to the users in Python
+    prefs = defaultdict(dict)
+    language_prefs = UserPreference.objects.filter(key__in=(LANGUAGE_KEY, DARK_LANGUAGE_KEY)).values_list(
+        "user_id", "key", "value"
+    )
+    for user_id, key, value in language_prefs.iterator():
+        prefs[user_id][key] = value
+
+    for user_id, username in User.objects.values_list("id", "username").iterator():
+        user_prefs = prefs.get(user_id, {})
+        yield {
+            "username": username,
+            "dark_lang": user_prefs.get(DARK_LANGUAGE_KEY, "N/A"),
+            "pref_lang": user_prefs.get(LANGUAGE_KEY, "N/A"),
+        }
 
 
 def list_user_pref_lang():
@@ -362,90 +413,70 @@ def list_user_pref_lang():
               ...
           ]
     """
-    # Subquery to get the preference value for each user
-    user_pref_subquery = UserPreference.objects.filter(user=OuterRef("pk"), key=LANGUAGE_KEY).values("value")[:1]
-    user_dark_subquery = UserPreference.objects.filter(user=OuterRef("pk"), key=DARK_LANGUAGE_KEY).values("value")[:1]
-
-    # Annotate users with their preference value or 'N/A' if not set
-    users_with_prefs = User.objects.annotate(
-        pref_lang=Coalesce(
-            Subquery(user_pref_subquery, output_field=TextField()),
-            Value("N/A", output_field=TextField()),
-        )
-    ).annotate(
-        dark_lang=Coalesce(
-            Subquery(user_dark_subquery, output_field=TextField()),
-            Value("N/A", output_field=TextField()),
-        )
-    )
-
-    pref_lang_data = []
-
-    for user in users_with_prefs:
-        pref_lang = {
-            "username": user.username,
-            "dark_lang": user.dark_lang,
-            "pref_lang": user.pref_lang,
-        }
-        pref_lang_data.append(pref_lang)
-
-    return pref_lang_data
+    return list(iter_user_pref_lang())
 
 
 def get_users_with_enrollments():
+    """
+    Users with at least one active enrollment, with those active enrollments and their courses prefetched
+    as `active_enrollments`.
+    """
+    # Courses are prefetched rather than joined so enrollments without a CourseOverview are kept.
+    active_enrollments = CourseEnrollment.objects.filter(is_active=True)
     return (
-        User.objects.prefetch_related("courseenrollment_set__course").filter(courseenrollment__is_active=1).distinct()
+        User.objects.filter(courseenrollment__is_active=1)
+        .prefetch_related(
+            Prefetch("courseenrollment_set", queryset=active_enrollments, to_attr="active_enrollments"),
+            "active_enrollments__course",
+        )
+        .distinct()
     )
 
 
-def list_users_enrollments():
+def iter_users_enrollments():
     users_with_course_enrollments = get_users_with_enrollments()
 
-    users_enrollments_data = []
-
     for user in users_with_course_enrollments:
-        user_enrollments = user.courseenrollment_set.all()
+        user_enrollments = user.active_enrollments
         user_completions = get_user_course_completions(user, user_enrollments)
-        user_enrollments_count = user_enrollments.count()
+        user_enrollments_count = len(user_enrollments)
 
-        users_enrollments_data.append(
-            {
-                "username": user.username,
-                "enrollments_count": user_enrollments_count,
-                "completions_count": user_completions,
-            }
-        )
+        yield {
+            "username": user.username,
+            "enrollments_count": user_enrollments_count,
+            "completions_count": user_completions,
+        }
 
-    return users_enrollments_data
 
+def list_users_enrollments():
+    return list(iter_users_enrollments())
 
-def list_enrollment_activity():
-    date_format = "%Y-%m-%d"
-    users_with_course_enrollments = get_users_with_enrollments()
 
-    enrollments_activity_data = []
+def get_active_enrollments():
+    """
+    (user_id, username, course_id, course title, enrollment date) rows of all active enrollments.
 
-    for user in users_with_course_enrollments:
-        user_enrollments = user.courseenrollment_set.all()
-        for enrollment in user_enrollments:
-            log.info("find me: " + str(enrollment.id))
-            try:
-                course = enrollment.course
-            except CourseOverview.DoesNotExist:
-                log.info(f"CourseOverview with ID {enrollment.course_id} does not exist")
-                continue
-            except Exception as e:
-                raise e
-            course_completion_date = get_course_completion_date(user, course.id)
-            enrollments_activity_data.append(
-                {
-                    "username": user.username,
-                    "course_title": course.display_name,
-                    "enrollment_date": enrollment.created.strftime(date_format),
-                    "completion_date": (
-                        course_completion_date.strftime(date_format) if course_completion_date else "N/A"
-                    ),
-                }
-            )
+    Enrollments whose CourseOverview is missing are left out by the join.
+    """
+    return CourseEnrollment.objects.filter(is_active=True).values_list(
+        "user_id", "user__username", "course_id", "course__display_name", "created"
+    )
 
-    return enrollments_activity_data
+
+def iter_enrollment_activity():
+    date_format = "%Y-%m-%d"
+    enrollments = get_active_enrollments()
+    completion_dates = get_course_completion_dates(enrollments)
+
+    for user_id, username, course_id, course_title, created in enrollments.iterator(chunk_size=2000):
+        course_completion_date = completion_dates.get((user_id, course_id))
+        yield {
+            "username": username,
+            "course_title": course_title,
+            "enrollment_date": created.strftime(date_format),
+            "completion_date": (course_completion_date.strftime(date_format) if course_completion_date else "N/A"),
+        }
+
+
+def list_enrollment_activity():
+    return list(iter_enrollment_activity())
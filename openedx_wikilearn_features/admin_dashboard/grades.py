@@ -347,15 +347,14 @@ class MultipleCourseGradeReport:
         """
         date = datetime.now(UTC)
         upload_multiple_course_csv_to_report_store(
-            [success_headers] + success_rows,
+            chain([success_headers], success_rows),
             "multiple_courses_grade_report",
             context.course_id,
             date,
         )
         if len(error_rows) > 0:
-            error_rows = [error_headers] + error_rows
             upload_multiple_course_csv_to_report_store(
-                error_rows, "multiple_courses_grade_report_err", context.course_id, date
+                chain([error_headers], error_rows), "multiple_courses_grade_report_err", context.course_id, date
             )
 
     def _batch_users(self, context):
@@ -7,3 +7,6 @@ from openedx_wikilearn_features import ROOT_DIRECTORY
 
 def plugin_settings(settings):
     settings.MAKO_TEMPLATE_DIRS_BASE.append(ROOT_DIRECTORY / "admin_dashboard" / "templates")
+
+    # Upload admin CSV reports gzip compressed, as .csv.gz files
+    settings.ADMIN_DASHBOARD_GZIP_REPORTS = False
@@ -11,6 +11,15 @@ from openedx_wikilearn_features.admin_dashboard.tasks import (
 )
 from openedx_wikilearn_features.admin_dashboard.utils import get_report_tab_link, get_instructor_tab_link
 
+INSTRUCTOR_REPORT_TASK_TYPES = frozenset(
+    (
+        "generate_anonymous_ids_for_course",
+        "profile_info_csv",
+        "grade_course",
+        "grade_problems",
+    )
+)
+
 
 def send_report_ready_email(instance, report_link):
     """Send email to the user who requesed the report
@@ -27,20 +36,17 @@ def send_report_ready_email(instance, report_link):
         course_ids = [str(instance.course_id)]
 
     try:
-        courses = list(CourseOverview.objects.filter(id__in=course_ids))
+        courses_names = list(CourseOverview.objects.filter(id__in=course_ids).values_list("display_name", flat=True))
     except InvalidKeyError:
-        courses = []
+        courses_names = []
 
-    if len(courses) > 1:
-        courses_names = list()
-        for course in courses:
-            courses_names.append(f'"{course.display_name}"')
-        courses_names_str = ", ".join(courses_names)
+    if len(courses_names) > 1:
+        courses_names_str = ", ".join(f'"{name}"' for name in courses_names)
         course_msg = f"the courses {courses_names_str}"
-    elif len(courses) == 1:
-        course_msg = f'the course "{courses[0].display_name}"'
+    elif len(courses_names) == 1:
+        course_msg = f'the course "{courses_names[0]}"'
     else:
-        course_msg = f"all courses"
+        course_msg = "all courses"
 
     email_msg = 'The "{}" report you requested for {} is ready.'.format(report_type, course_msg)
     data = {"report_link":  report_link, "email_msg": email_msg}
@@ -55,12 +61,5 @@ def send_email_when_report_ready(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=InstructorTask)
 def send_email_when_report_ready_instructor(sender, instance, created, **kwargs):
-    admin_report_task_types = [
-        "generate_anonymous_ids_for_course",
-        "profile_info_csv",
-        "grade_course",
-        "grade_problems",
-    ]
-
-    if instance.task_state == SUCCESS and instance.task_type in admin_report_task_types:
+    if instance.task_state == SUCCESS and instance.task_type in INSTRUCTOR_REPORT_TASK_TYPES:
         send_report_ready_email(instance, get_instructor_tab_link(instance.course_id))
@@ -195,7 +195,7 @@ def task_enrollment_activity_report(entry_id, xmodule_instance_args, user_id):
     return run_main_task(entry_id, task_fn, action_name, user_id)
 
 
-@shared_task(base=LoggedTask)
+@shared_task(base=LoggedTask, ignore_result=True)
 def send_report_ready_email_task(msg_class_key, context, subject, email):
     TASK_LOG.info("Initiated task to send admin report ready notifications.")
     send_notification(msg_class_key, context, subject, email)
@@ -1,16 +1,18 @@
+import codecs
+import gzip
 from datetime import datetime
-from unittest.mock import MagicMock, PropertyMock, patch
+from unittest.mock import MagicMock, patch
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext as _
-from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
 from openedx_wikilearn_features.admin_dashboard.admin_task.api import (
     SUCCESS_MESSAGE_TEMPLATE,
 )
+from openedx_wikilearn_features.admin_dashboard.course_versions.task_helper import ProgressBuffer
 from openedx_wikilearn_features.admin_dashboard.course_versions.utils import (
     list_enrollment_activity,
 )
@@ -18,6 +20,11 @@ from openedx_wikilearn_features.admin_dashboard.tasks import (
     task_enrollment_activity_report,
     upload_enrollment_activity_csv,
 )
+from openedx_wikilearn_features.admin_dashboard.utils import (
+    get_report_store,
+    serialize_csv,
+    upload_multiple_course_csv_to_report_store,
+)
 
 User = get_user_model()
 
@@ -41,12 +48,12 @@ class EnrollmentActivityReportViewTest(TestCase):
             task_enrollment_activity_report,
             "all_courses",
             {
-                "features": [
+                "features": (
                     "username",
                     "course_title",
                     "enrollment_date",
                     "completion_date",
-                ],
+                ),
                 "csv_type": _("enrollment_acctivity_report"),
             },
             "",
@@ -83,25 +90,32 @@ class EnrollmentActivityReportTaskTest(TestCase):
 
 
 class TestUploadEnrollmentActivityCSV(TestCase):
+    def setUp(self):
+        get_report_store.cache_clear()
+        self.addCleanup(get_report_store.cache_clear)
+
     @patch("openedx_wikilearn_features.admin_dashboard.course_versions.task_helper.datetime")
-    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.task_helper.list_enrollment_activity")
-    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.task_helper.format_dictlist")
-    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.task_helper.ReportStore")
+    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.task_helper.iter_enrollment_activity")
+    @patch("openedx_wikilearn_features.admin_dashboard.utils.ReportStore")
     @patch("openedx_wikilearn_features.admin_dashboard.course_versions.task_helper.TaskProgress")
     def test_upload_enrollment_activity_csv(
         self,
         mock_task_progress,
         mock_report_store,
-        mock_format_dictlist,
-        mock_list_enrollment_activity,
+        mock_iter_enrollment_activity,
         mock_datetime,
     ):
         # Set up mock datetime and enrollment activity data
         mock_datetime.now.return_value = datetime(2024, 11, 6, 12, 0, 0)  # Controlled datetime
-        mock_list_enrollment_activity.return_value = [("user1", "course1", "2024-01-01", "2024-02-01")]
-        mock_format_dictlist.return_value = (
-            [],
-            [["user1", "course1", "2024-01-01", "2024-02-01"]],
+        mock_iter_enrollment_activity.return_value = iter(
+            [
+                {
+                    "username": "user1",
+                    "course_title": "course1",
+                    "enrollment_date": "2024-01-01",
+                    "completion_date": "2024-02-01",
+                }
+            ]
         )
 
         # Mock ReportStore
@@ -114,7 +128,7 @@ class TestUploadEnrollmentActivityCSV(TestCase):
 
         # Define task input
         task_input = {
-            "features": ["User", "Course Title", "Enrollment Date", "Completion Date"],
+            "features": ["username", "course_title", "enrollment_date", "completion_date"],
             "csv_type": "enrollment_activity",
         }
         action_name = "upload_enrollment"
@@ -133,51 +147,130 @@ class TestUploadEnrollmentActivityCSV(TestCase):
             user_ids,
         )
 
-        mock_list_enrollment_activity.assert_called_once()
-        mock_report_store_instance.store_rows.assert_called_once_with(
-            course_id_str,
-            "enrollment_activity_2024-11-06-1200.csv",
-            [
-                ["User", "Course Title", "Enrollment Date", "Completion Date"],
-                ["user1", "course1", "2024-01-01", "2024-02-01"],
-            ],
+        mock_iter_enrollment_activity.assert_called_once()
+        mock_report_store_instance.store.assert_called_once()
+        store_course_id, report_name, buff = mock_report_store_instance.store.call_args.args
+        self.assertEqual(store_course_id, course_id_str)
+        self.assertEqual(report_name, "enrollment_activity_2024-11-06-1200.csv")
+        self.assertEqual(
+            buff.read(),
+            codecs.BOM_UTF8
+            + b"User,Course Title,Enrollment Date,Completion Date\r\nuser1,course1,2024-01-01,2024-02-01\r\n",
         )
+        self.assertEqual(
+            [call.kwargs["extra_meta"] for call in mock_task_progress_instance.update_task_state.call_args_list],
+            [{"step": "Getting enrollments"}, {"step": "Uploading CSV"}],
+        )
+        self.assertEqual(mock_task_progress_instance.succeeded, 1)
 
 
-class TestListEnrollmentActivity(TestCase):
-    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.utils.get_users_with_enrollments")
-    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.utils.get_course_completion_date")
-    def test_list_enrollment_activity_valid_data(
-        self, mock_get_course_completion_date, mock_get_users_with_enrollments
-    ):
+class TestProgressBuffer(TestCase):
+    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.task_helper.monotonic")
+    def test_step_within_interval_is_written_by_flush(self, mock_monotonic):
         """
-        Test that the function returns the correct enrollment activity with valid data.
+        Test that a step set within the interval is only written by the final flush.
         """
-        # Set up mock data
-        mock_enrollment1 = MagicMock(
-            course=MagicMock(display_name="Course 1"),
-            is_active=1,
-            created=timezone.now(),
+        mock_monotonic.side_effect = [0.0, 1.0, 2.0]
+        task_progress = MagicMock()
+        progress = ProgressBuffer(task_progress)
+
+        progress.set_step("Calculating")
+        progress.set_step("Uploading CSV")
+        progress.flush()
+
+        self.assertEqual(
+            [call.kwargs["extra_meta"] for call in task_progress.update_task_state.call_args_list],
+            [{"step": "Calculating"}, {"step": "Uploading CSV"}],
         )
-        mock_enrollment2 = MagicMock(
-            course=MagicMock(display_name="Course 2"),
-            is_active=1,
-            created=timezone.now(),
+
+    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.task_helper.monotonic")
+    def test_step_after_interval_is_written(self, mock_monotonic):
+        """
+        Test that a step set once the interval has passed is written straight away.
+        """
+        mock_monotonic.side_effect = [0.0, 6.0, 6.0, 7.0]
+        task_progress = MagicMock()
+        progress = ProgressBuffer(task_progress)
+
+        progress.set_step("Calculating")
+        progress.set_step("Uploading CSV")
+        progress.flush()
+
+        self.assertEqual(
+            [call.kwargs["extra_meta"] for call in task_progress.update_task_state.call_args_list],
+            [{"step": "Calculating"}, {"step": "Uploading CSV"}, {"step": "Uploading CSV"}],
         )
 
-        mock_user1 = MagicMock(username="user1")
-        mock_user1.courseenrollment_set.all.return_value = [
-            mock_enrollment1,
-            mock_enrollment2,
-        ]
 
-        mock_get_users_with_enrollments.return_value = [mock_user1]
+class TestSerializeCSV(TestCase):
+    def test_serialize_csv_starts_with_bom(self):
+        """
+        Test that the CSV starts with a UTF-8 BOM, as ReportStore.store_rows writes it.
+        """
+        buff = serialize_csv([["Name"], ["Zoë"]])
+
+        self.assertEqual(buff.read(), codecs.BOM_UTF8 + "Name\r\nZoë\r\n".encode("utf-8"))
+
+    @override_settings(ADMIN_DASHBOARD_GZIP_REPORTS=True)
+    def test_serialize_csv_gzip_starts_with_bom(self):
+        """
+        Test that the BOM is written inside the gzip stream when reports are compressed.
+        """
+        buff = serialize_csv([["Name"], ["Zoë"]])
+
+        self.assertEqual(gzip.decompress(buff.read()), codecs.BOM_UTF8 + "Name\r\nZoë\r\n".encode("utf-8"))
+
+
+class TestUploadMultipleCourseCSV(TestCase):
+    def setUp(self):
+        get_report_store.cache_clear()
+        self.addCleanup(get_report_store.cache_clear)
+
+    @patch("openedx_wikilearn_features.admin_dashboard.utils.tracker")
+    @patch("openedx_wikilearn_features.admin_dashboard.utils.ReportStore")
+    def test_upload_multiple_course_csv_starts_with_bom(self, mock_report_store, mock_tracker):
+        """
+        Test that the multiple course grade report is stored with a UTF-8 BOM.
+        """
+        mock_report_store_instance = MagicMock()
+        mock_report_store.from_config.return_value = mock_report_store_instance
+
+        report_name = upload_multiple_course_csv_to_report_store(
+            iter([["Username", "Grade"], ["user1", "0.5"]]),
+            "multiple_course_grade_report",
+            "course1",
+            datetime(2024, 11, 6, 12, 0, 0),
+        )
+
+        self.assertEqual(report_name, "multiple_course_grade_report_2024-11-06-1200.csv")
+        _, _, buff = mock_report_store_instance.store.call_args.args
+        self.assertEqual(buff.read(), codecs.BOM_UTF8 + b"Username,Grade\r\nuser1,0.5\r\n")
+        mock_tracker.emit.assert_called_once()
+
+
+class TestListEnrollmentActivity(TestCase):
+    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.utils.get_active_enrollments")
+    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.utils.get_course_completion_dates")
+    def test_list_enrollment_activity_valid_data(self, mock_get_course_completion_dates, mock_get_active_enrollments):
+        """
+        Test that the function returns the correct enrollment activity with valid data.
+        """
+        # Set up mock (user_id, username, course_id, course title, enrollment date) rows
+        mock_get_active_enrollments.return_value.iterator.return_value = [
+            (1, "user1", "course-v1:org+course1+run", "Course 1", timezone.now()),
+            (1, "user1", "course-v1:org+course2+run", "Course 2", timezone.now()),
+        ]
 
         # Mock course completion dates
-        mock_get_course_completion_date.return_value = timezone.now()
+        mock_get_course_completion_dates.return_value = {
+            (1, "course-v1:org+course1+run"): timezone.now(),
+        }
 
         activity_data = list_enrollment_activity()
 
+        # Completion dates are only looked up for the reported enrollments
+        mock_get_course_completion_dates.assert_called_once_with(mock_get_active_enrollments.return_value)
+
         # Validate the data structure
         self.assertEqual(len(activity_data), 2)
         self.assertEqual(activity_data[0]["username"], "user1")
@@ -185,12 +278,12 @@ class TestListEnrollmentActivity(TestCase):
         self.assertIn("enrollment_date", activity_data[0])
         self.assertIn("completion_date", activity_data[0])
 
-    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.utils.get_users_with_enrollments")
-    def test_list_enrollment_activity_empty_enrollments(self, mock_get_users_with_enrollments):
+    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.utils.get_active_enrollments")
+    def test_list_enrollment_activity_empty_enrollments(self, mock_get_active_enrollments):
         """
         Test that the function returns an empty list if there are no enrollments.
         """
-        mock_get_users_with_enrollments.return_value = []
+        mock_get_active_enrollments.return_value.iterator.return_value = []
 
         # Call the function
         activity_data = list_enrollment_activity()
@@ -198,26 +291,24 @@ class TestListEnrollmentActivity(TestCase):
         # Assert that the returned list is empty
         self.assertEqual(activity_data, [])
 
-    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.utils.get_users_with_enrollments")
-    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.utils.get_course_completion_date")
-    def test_list_enrollment_activity_course_does_not_exist(
-        self, mock_get_course_completion_date, mock_get_users_with_enrollments
+    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.utils.get_active_enrollments")
+    @patch("openedx_wikilearn_features.admin_dashboard.course_versions.utils.get_course_completion_dates")
+    def test_list_enrollment_activity_completion_dates(
+        self, mock_get_course_completion_dates, mock_get_active_enrollments
     ):
         """
-        Test that the function handles cases where the course does not exist.
+        Test that completion dates are formatted, and "N/A" is used for courses that are not completed.
         """
-        # Set up mock data where one enrollment has no course
-        mock_enrollment = MagicMock(created=timezone.now())
-        type(mock_enrollment).course = PropertyMock(side_effect=CourseOverview.DoesNotExist)
-        mock_user = MagicMock(username="user1")
-        mock_user.courseenrollment_set.all.return_value = [mock_enrollment]
-
-        mock_get_users_with_enrollments.return_value = [mock_user]
-
-        mock_get_course_completion_date.return_value = None
+        mock_get_active_enrollments.return_value.iterator.return_value = [
+            (1, "user1", "course-v1:org+course1+run", "Course 1", datetime(2024, 1, 1)),
+            (2, "user2", "course-v1:org+course1+run", "Course 1", datetime(2024, 1, 2)),
+        ]
+        mock_get_course_completion_dates.return_value = {
+            (1, "course-v1:org+course1+run"): datetime(2024, 2, 1),
+        }
 
         activity_data = list_enrollment_activity()
 
-        # Assert results when course is missing
-        print(activity_data)
-        self.assertEqual(len(activity_data), 0)
+        self.assertEqual(activity_data[0]["enrollment_date"], "2024-01-01")
+        self.assertEqual(activity_data[0]["completion_date"], "2024-02-01")
+        self.assertEqual(activity_data[1]["completion_date"], "N/A")
@@ -42,24 +42,24 @@ urlpatterns = [
         course_version_report,
         name="course_version_report",
     ),
-    re_path(
-        r"^courses_enrollment_report",
+    path(
+        "courses_enrollment_report",
         courses_enrollment_report,
         name="courses_enrollment_report",
     ),
-    re_path(
-        r"^all_courses_enrollment_report",
+    path(
+        "all_courses_enrollment_report",
         all_courses_enrollment_report,
         name="all_courses_enrollment_report",
     ),
-    re_path(r"^user_pref_lang_report", user_pref_lang_report, name="user_pref_lang_report"),
-    re_path(
-        r"^users_enrollment_report",
+    path("user_pref_lang_report", user_pref_lang_report, name="user_pref_lang_report"),
+    path(
+        "users_enrollment_report",
         users_enrollment_report,
         name="users_enrollment_report",
     ),
-    re_path(
-        r"^enrollment_activity_report",
+    path(
+        "enrollment_activity_report",
         enrollment_activity_report,
         name="enrollment_activity_report",
     ),
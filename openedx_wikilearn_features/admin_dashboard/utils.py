@@ -2,14 +2,66 @@
 Utility methods for instructor tasks
 """
 
+import codecs
+import csv
+import gzip
+from functools import lru_cache
+from io import BytesIO, TextIOWrapper
 from urllib.parse import urljoin
 
 from django.conf import settings
+from django.core.cache import cache
 from django.urls import reverse
 from eventtracking import tracker
 from lms.djangoapps.instructor_task.models import ReportStore
 
 REPORT_REQUESTED_EVENT_NAME = "edx.instructor.report.requested"
+# The dashboard polls the report downloads list, which is a storage listing on every call.
+REPORT_LINKS_CACHE_TIMEOUT = 60
+
+
+@lru_cache(maxsize=4)
+def get_report_store(config_name="GRADES_DOWNLOAD"):
+    """
+    Return the ReportStore for `config_name`, reusing it across calls made by this process.
+    """
+    return ReportStore.from_config(config_name)
+
+
+def _gzip_reports():
+    """
+    Whether admin CSV reports are uploaded gzip compressed.
+    """
+    return getattr(settings, "ADMIN_DASHBOARD_GZIP_REPORTS", False)
+
+
+def report_filename(name):
+    """
+    Return the report file name for `name`, with the extension matching `serialize_csv` output.
+    """
+    return f"{name}.csv.gz" if _gzip_reports() else f"{name}.csv"
+
+
+def serialize_csv(rows):
+    """
+    Write `rows` as utf-8 encoded CSV into a single in-memory buffer, ready to be read from the beginning.
+
+    `rows` may be any iterable, it is consumed as it is written. Like ReportStore.store_rows, the CSV starts
+    with a UTF-8 BOM so Excel detects the encoding. The CSV is gzip compressed when
+    ADMIN_DASHBOARD_GZIP_REPORTS is enabled.
+    """
+    buff = BytesIO()
+    sink = gzip.GzipFile(fileobj=buff, mode="wb", compresslevel=3) if _gzip_reports() else buff
+    sink.write(codecs.BOM_UTF8)
+    text = TextIOWrapper(sink, encoding="utf-8", newline="", write_through=True)
+    csv.writer(text).writerows(rows)
+    # Detach so the wrapper doesn't close the underlying buffer when it is collected.
+    text.detach()
+    if sink is not buff:
+        # Writes the gzip trailer, leaves `buff` open.
+        sink.close()
+    buff.seek(0)
+    return buff
 
 
 def upload_multiple_course_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name="GRADES_DOWNLOAD"):
@@ -17,7 +69,7 @@ def upload_multiple_course_csv_to_report_store(rows, csv_name, course_id, timest
     Upload data as a CSV using ReportStore.
 
     Arguments:
-        rows: CSV data in the following format (first column may be a
+        rows: iterable of CSV rows in the following format (first row may be a
             header):
             [
                 [row1_colum1, row1_colum2, ...],
@@ -29,12 +81,11 @@ def upload_multiple_course_csv_to_report_store(rows, csv_name, course_id, timest
     Returns:
         report_name: string - Name of the generated report
     """
-    report_store = ReportStore.from_config(config_name)
-    report_name = "{csv_name}_{timestamp_str}.csv".format(
-        csv_name=csv_name, timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-    )
+    report_store = get_report_store(config_name)
+    report_name = report_filename(f"{csv_name}_{timestamp:%Y-%m-%d-%H%M}")
 
-    report_store.store_rows(course_id, report_name, rows)
+    report_store.store(course_id, report_name, serialize_csv(rows))
+    invalidate_report_links(course_id, config_name)
     tracker_emit(csv_name)
     return report_name
 
@@ -51,32 +102,57 @@ def tracker_emit(report_name):
     )
 
 
-def list_report_downloads_links(course_id="all_courses", report_name=None):
-    report_store = ReportStore.from_config(config_name="GRADES_DOWNLOAD")
+def _report_links_cache_key(course_id, config_name):
+    return f"admin_dashboard.report_links:{config_name}:{course_id}"
 
+
+def get_report_links(course_id="all_courses", config_name="GRADES_DOWNLOAD"):
+    """
+    (name, url) pairs of the reports stored for `course_id`, cached for REPORT_LINKS_CACHE_TIMEOUT seconds.
+    """
+    return cache.get_or_set(
+        _report_links_cache_key(course_id, config_name),
+        lambda: list(get_report_store(config_name).links_for(course_id)),
+        REPORT_LINKS_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_report_links(course_id, config_name="GRADES_DOWNLOAD"):
+    """
+    Drop the cached report links of `course_id`, to be called once a report is stored for it.
+    """
+    cache.delete(_report_links_cache_key(course_id, config_name))
+
+
+def list_report_downloads_links(course_id="all_courses", report_name=None):
     return [
         dict(name=name, url=url)
-        for name, url in report_store.links_for(course_id)
+        for name, url in get_report_links(course_id)
         if report_name is None or name == report_name
     ]
 
 
+@lru_cache(maxsize=None)
 def get_report_tab_link():
+    """
+    Absolute link to the admin dashboard reports tab, constant for a deployment.
+    """
     lms_root_url = settings.LMS_ROOT_URL
     return urljoin(lms_root_url, reverse("admin_dashboard:course_reports"))
 
+
+@lru_cache(maxsize=None)
+def _courses_url_prefix():
+    """
+    Absolute LMS courses URL prefix, constant for a deployment.
+    """
+    return urljoin(settings.LMS_ROOT_URL, "/courses/")
+
+
 def get_instructor_tab_link(course_id):
     """
     Build Instructor → Data Download tab link for a course.
 
     course_id: CourseLocator
     """
-    locator = course_id
-
-    course_key_url = (
-        f"course-v1:{locator.org}+{locator.course}+{locator.run}"
-    )
-
-    path = f"/courses/{course_key_url}/instructor#view-data_download"
-
-    return urljoin(settings.LMS_ROOT_URL, path)
+    return f"{_courses_url_prefix()}{course_id}/instructor#view-data_download"
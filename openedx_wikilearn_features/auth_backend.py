@@ -1,4 +1,5 @@
 import logging
+from functools import lru_cache
 
 from common.djangoapps.third_party_auth.identityserver3 import IdentityServer3
 from django.conf import settings
@@ -8,6 +9,17 @@ from social_core.exceptions import AuthException
 log = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _user_agent():
+    """
+    User-Agent sent to the Wikimedia IdP, built once from the deployment settings.
+    """
+    client = getattr(settings, "PLATFORM_NAME", "wikilearn")
+    site = getattr(settings, "LMS_ROOT_URL", "https://learn.wiki/")
+    contact_mail = getattr(settings, "CONTACT_EMAIL", "comdevteam@wikimedia.org")
+    return f"{client}/0.13 ({site}; {contact_mail})"
+
+
 class WikimediaIdentityServer(IdentityServer3):
     """
     An extension of the IdentityServer3 for use with Wikimedia's IdP service.
@@ -19,21 +31,15 @@ class WikimediaIdentityServer(IdentityServer3):
 
     def _parse_name(self, name):
         fullname = name
-        if " " in fullname:
-            firstname, lastname = fullname.split(" ", 1)
-        else:
-            firstname = name
-            lastname = ""
+        # lastname is empty when there is no space in the name.
+        firstname, _, lastname = fullname.partition(" ")
         # Truncate the firstname to max 30 characters. User model doesn't accepts firstname above 30 characters.
-        firstname = firstname if len(firstname) <= 30 else firstname[:30]
+        firstname = firstname[:30]
         return fullname, firstname, lastname
 
     def auth_headers(self):
         headers = super().auth_headers()
-        client = getattr(settings, "PLATFORM_NAME", "wikilearn")
-        site = getattr(settings, "LMS_ROOT_URL", "https://learn.wiki/")
-        contact_mail = getattr(settings, "CONTACT_EMAIL", "comdevteam@wikimedia.org")
-        headers["User-Agent"] = f"{client}/0.13 ({site}; {contact_mail})"
+        headers["User-Agent"] = _user_agent()
 
         return headers
 
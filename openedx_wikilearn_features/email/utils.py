@@ -1,13 +1,13 @@
 import json
 import logging
+import threading
 from datetime import datetime
+from functools import lru_cache
 
 import markdown
-import pytz
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.sites.models import Site
-from django.urls import reverse
 from django.utils.timezone import localtime
 from edx_ace import ace
 from edx_ace.recipient import Recipient
@@ -24,6 +24,9 @@ from openedx_wikilearn_features.email import message_types
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Markdown instances keep parser state and are not thread safe, so each thread builds its own.
+_markdown = threading.local()
+
 MESSAGE_TYPES = {
     "pending_messages": message_types.PendingMessagesNotification,
     "thread_mention": message_types.ThreadMentionNotification,
@@ -32,6 +35,41 @@ MESSAGE_TYPES = {
 }
 
 
+class _LazyJson:
+    """
+    Log argument that JSON encodes `obj` only when the log record is actually formatted.
+    """
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __str__(self):
+        return json.dumps(self.obj)
+
+
+@lru_cache(maxsize=1)
+def _email_admin_user():
+    """
+    The EMAIL_ADMIN user that notifications are sent as, fetched once per process.
+
+    Cleared by `clear_email_admin_user` when the account is saved or deleted in this process.
+
+    Raises User.DoesNotExist, which is not cached, when there is no such user.
+    """
+    return User.objects.get(username=settings.EMAIL_ADMIN)
+
+
+def clear_email_admin_user(user):
+    """
+    Drop the cached EMAIL_ADMIN user when `user` is that account, or was renamed from it.
+    """
+    is_cached_admin = _email_admin_user.cache_info().currsize and _email_admin_user().pk == user.pk
+    if user.username == settings.EMAIL_ADMIN or is_cached_admin:
+        _email_admin_user.cache_clear()
+
+
 def send_weekly_digest_ace_message(request_user, request_site, dest_email, notification_context, message_class):
     """
     Send a single ACE message that includes a list of contexts.
@@ -59,8 +97,9 @@ def send_weekly_digest_ace_message(request_user, request_site, dest_email, notif
     grouped_contexts = {}
     for context in thread_contexts:
         location = context.get("location", "General Discussion")
-        if location not in grouped_contexts:
-            grouped_contexts[location] = {
+        group = grouped_contexts.get(location)
+        if group is None:
+            group = grouped_contexts[location] = {
                 "unit_name": context.get("unit_name", "General Discussion"),
                 "first_post_link": context.get("post_link", "#"),
                 "courseware_url": context.get("courseware_url", "#"),
@@ -69,20 +108,10 @@ def send_weekly_digest_ace_message(request_user, request_site, dest_email, notif
                     context.get("post_link").rsplit("/threads", 1)[0] if location == "General Discussion" else None
                 ),
             }
-        grouped_contexts[location]["threads"].append(context)
+        group["threads"].append(context)
 
     # Flatten the grouped contexts into a list
-    sorted_contexts = [
-        {
-            "location": loc,
-            "unit_name": data["unit_name"],
-            "first_post_link": data["first_post_link"],
-            "courseware_url": data["courseware_url"],
-            "threads": data["threads"],
-            "base_url": data["base_url"],
-        }
-        for loc, data in grouped_contexts.items()
-    ]
+    sorted_contexts = [{"location": loc, **data} for loc, data in grouped_contexts.items()]
 
     # Merge common context into the unified context
     unified_context = {**common_context, "grouped_thread_contexts": sorted_contexts}
@@ -136,7 +165,7 @@ def send_notification(message_type, data, subject, dest_emails, request_user=Non
 
     if not request_user:
         try:
-            request_user = User.objects.get(username=settings.EMAIL_ADMIN)
+            request_user = _email_admin_user()
         except User.DoesNotExist:
             logger.error(
                 "Unable to send email as Email Admin User with username: {} does not exist.".format(
@@ -149,7 +178,6 @@ def send_notification(message_type, data, subject, dest_emails, request_user=Non
 
     message_context = get_base_template_context(current_site)
     message_context.update(data)
-    content = json.dumps(message_context)
 
     message_class = MESSAGE_TYPES[message_type]
     return_value = True
@@ -170,9 +198,9 @@ def send_notification(message_type, data, subject, dest_emails, request_user=Non
         message_context.update({"email": email})
         try:
             send_ace_message(request_user, current_site, email, message_context, message_class)
-            logger.info('Email has been sent to "%s" for content %s.', email, content)
+            logger.info('Email has been sent to "%s".', email)
         except Exception as e:
-            logger.error('Unable to send an email to %s for content "%s"', email, content)
+            logger.error('Unable to send an email to %s for content "%s"', email, _LazyJson(message_context))
             logger.error(e)
             return_value = False
 
@@ -209,12 +237,22 @@ def send_weekly_digest_notification(
     Raises:
         User.DoesNotExist: If the EMAIL_ADMIN user does not exist when no request_user is provided.
     """
+    if not dest_emails or not notification_context.get("thread_contexts"):
+        logger.info("No recipients or threads, skipping the weekly digest email.")
+        return True
+
+    try:
+        message_class = MESSAGE_TYPES[message_type]
+    except KeyError:
+        logger.error("Unable to send email, unknown message type: %s", message_type)
+        return False
+
     if not current_site:
-        current_site = Site.objects.all().first()
+        current_site = Site.objects.select_related("configuration").first()
 
     if not request_user:
         try:
-            request_user = User.objects.get(username=settings.EMAIL_ADMIN)
+            request_user = _email_admin_user()
         except User.DoesNotExist:
             logger.error(
                 "Unable to send email as Email Admin User with username: {} does not exist.".format(
@@ -230,7 +268,7 @@ def send_weekly_digest_notification(
     platform_name = current_site.configuration.get_value("platform_name")
     logo_url = current_site.configuration.get_value("DEFAULT_EMAIL_LOGO_URL", settings.DEFAULT_EMAIL_LOGO_URL)
     messenger_url = "{base_url}{messenger_path}".format(
-        base_url=base_root_url, messenger_path=reverse("messenger:messenger_home")
+        base_url=base_root_url, messenger_path=getattr(settings, "MESSENGER_MICROFRONTEND_URL", None)
     )
 
     base_template_context = get_base_template_context(current_site)
@@ -256,18 +294,18 @@ def send_weekly_digest_notification(
                 current_site,
                 email,
                 email_context,
-                message_class=MESSAGE_TYPES[message_type],
+                message_class=message_class,
             )
             logger.info(
                 'Email has been sent to "%s" for content %s.',
                 email,
-                json.dumps(email_context),
+                _LazyJson(email_context),
             )
         except Exception as e:
             logger.error(
                 'Unable to send an email to %s for content "%s"',
                 email,
-                json.dumps(email_context),
+                _LazyJson(email_context),
             )
             logger.error(e)
             return False
@@ -275,18 +313,41 @@ def send_weekly_digest_notification(
     return True
 
 
-def update_context_with_thread(context, thread):
-    thread_author = User.objects.get(id=thread.user_id)
+def render_markdown(text):
+    """
+    Convert markdown `text` to HTML like markdown.markdown, reusing this thread's Markdown instance.
+    """
+    md = getattr(_markdown, "md", None)
+    if md is None:
+        md = _markdown.md = markdown.Markdown()
+    return md.reset().convert(text)
+
+
+def _get_author(user_id, users=None):
+    """
+    Return the author of a thread or comment, from `users` (a User.objects.in_bulk mapping) when it has them.
+
+    Forum posts carry the author id as a string.
+    """
+    if users is not None:
+        author = users.get(int(user_id))
+        if author is not None:
+            return author
+    return User.objects.get(id=user_id)
+
+
+def update_context_with_thread(context, thread, users=None):
+    thread_author = _get_author(thread.user_id, users)
     logger.info("thread_author.username is :%s", thread_author.username)
-    created_at_datetime = datetime.strptime(thread.created_at, "%Y-%m-%dT%H:%M:%SZ")
-    created_at_datetime = created_at_datetime.replace(tzinfo=pytz.utc)
+    # Forum timestamps are UTC with a "Z" suffix, which fromisoformat parses into an aware datetime.
+    created_at_datetime = datetime.fromisoformat(thread.created_at)
     formatted_date = localtime(created_at_datetime).date()
     formatted_date = formatted_date.strftime("%Y-%m-%d")
     context.update(
         {
             "thread_id": thread.id,
             "thread_title": thread.title,
-            "thread_body": markdown.markdown(thread.body),
+            "thread_body": render_markdown(thread.body),
             "thread_commentable_id": thread.commentable_id,
             "thread_author_id": thread_author.id,
             "thread_username": thread_author.username,
@@ -295,12 +356,12 @@ def update_context_with_thread(context, thread):
     )
 
 
-def update_context_with_comment(context, comment):
-    comment_author = User.objects.get(id=comment.user_id)
+def update_context_with_comment(context, comment, users=None):
+    comment_author = _get_author(comment.user_id, users)
     context.update(
         {
             "comment_id": comment.id,
-            "comment_body": markdown.markdown(comment.body),
+            "comment_body": render_markdown(comment.body),
             "comment_author_id": comment_author.id,
             "comment_username": comment_author.username,
             "comment_created_at": comment.created_at,
@@ -370,6 +431,10 @@ def send_thread_creation_email(receivers, notification_context, is_thread=True):
     logger.info("Sending thread creation emails to users: {}".format(receivers))
     key = "thread_creation"
 
+    if not receivers or not notification_context.get("thread_contexts"):
+        logger.info("No receivers or threads, skipping thread creation emails.")
+        return
+
     for context in notification_context["thread_contexts"]:
         if is_thread:
             created_by = context.get("thread_username")
@@ -1,7 +1,7 @@
 """
 Urls for Messenger v0 API(s)
 """
-from django.urls import re_path
+from django.urls import path
 
 from openedx_wikilearn_features.messenger.api.v0.views import (
     InboxView, ConversationView, MessageCreateView, UserSearchView, BulkMessageView
@@ -11,44 +11,44 @@ app_name = 'messenger_api_v0'
 
 
 urlpatterns = [
-    re_path(
-        r'^bulk_message/$',
+    path(
+        'bulk_message/',
         BulkMessageView.as_view({
             'post': 'bulk_message'
         }),
         name="bulk_message"
     ),
-    re_path(
-        r'^user/$',
+    path(
+        'user/',
         UserSearchView.as_view({
             'get': 'list'
         }),
         name="user_search"
     ),
-    re_path(
-        r'^inbox/$',
+    path(
+        'inbox/',
         InboxView.as_view({
             'get': 'list'
         }),
         name="user_inbox_list"
     ),
-    re_path(
-        r'^inbox/(?P<pk>\d+)/$',
+    path(
+        'inbox/<int:pk>/',
         InboxView.as_view({
             'patch': 'partial_update',
             'get': 'retrieve'
         }),
         name="user_inbox_detail"
     ),
-    re_path(
-        r'^conversation/$',
+    path(
+        'conversation/',
         ConversationView.as_view({
             'get': 'list',
         }),
         name="conversation_list"
     ),
-    re_path(
-        r'^message/$',
+    path(
+        'message/',
         MessageCreateView.as_view(),
         name="message_create"
     ),
@@ -2,6 +2,7 @@
 Django admin command to send message email emails.
 """
 from datetime import datetime
+from itertools import islice
 from logging import getLogger
 from django.core.management.base import BaseCommand
 
@@ -18,6 +19,9 @@ class Command(BaseCommand):
     """
     help = 'Command to check and send messenger emails for unread messages notification'
 
+    # Number of users whose emails are sent by a single celery task.
+    USER_BATCH_SIZE = 100
+
     def _get_notification_data(self):
         """
         it will traverse Inbox objects and return data (dict) that can be used to send notification of
@@ -69,4 +73,6 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         data = self._get_notification_data()
         self._log_final_report(data)
-        send_unread_messages_email_task.delay(data)
+        items = iter(data.items())
+        while batch := dict(islice(items, self.USER_BATCH_SIZE)):
+            send_unread_messages_email_task.delay(batch)
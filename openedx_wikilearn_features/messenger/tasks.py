@@ -1,7 +1,6 @@
 from logging import getLogger
 from celery import shared_task
 from celery_utils.logged_task import LoggedTask
-from django.conf import settings
 from django.contrib.auth.models import User
 
 from openedx_wikilearn_features.email.utils import send_unread_messages_email
@@ -9,13 +8,16 @@ from openedx_wikilearn_features.email.utils import send_unread_messages_email
 log = getLogger(__name__)
 
 
-@shared_task(base=LoggedTask)
+@shared_task(base=LoggedTask, ignore_result=True)
 def send_unread_messages_email_task(data):
+    users = User.objects.filter(username__in=list(data)).only("id", "username", "first_name", "last_name", "email")
+    users = {user.username: user for user in users}
+
+    missing_usernames = data.keys() - users.keys()
+    if missing_usernames:
+        log.error("Unable to send email, Users with usernames: {} do not exist.".format(sorted(missing_usernames)))
+
     for username, context in data.items():
-        try:
-            user = User.objects.get(username=username)
+        user = users.get(username)
+        if user:
             send_unread_messages_email(user, context)
-        except User.DoesNotExist:
-            log.error(
-                "Unable to send email User with username: {} does not exist.".format(settings.EMAIL_ADMIN)
-            )
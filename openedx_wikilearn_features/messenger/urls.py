@@ -2,14 +2,14 @@
 Urls for Messenger
 """
 from django.conf.urls import include
-from django.urls import re_path
+from django.urls import path
 
 
 app_name = 'messenger'
 
 urlpatterns = [
-    re_path(
-        r'^api/v0/',
+    path(
+        'api/v0/',
         include('openedx_wikilearn_features.messenger.api.v0.urls', namespace='messenger_api_v0')
     ),
 ]
@@ -9,10 +9,11 @@ from logging import getLogger
 from cms.djangoapps.contentstore.exceptions import AssetSizeTooLargeException
 from common.djangoapps.course_modes.models import CourseMode
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.sites.models import Site
 from django.contrib.staticfiles import finders
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from opaque_keys.edx.keys import CourseKey
 from xmodule.modulestore.django import modulestore
@@ -31,6 +32,7 @@ from openedx_wikilearn_features.wikimedia_general.utils import (
 
 from openedx_wikilearn_features.email.utils import (
     build_discussion_notification_context,
+    clear_email_admin_user,
     update_context_with_comment,
     update_context_with_thread,
 )
@@ -39,6 +41,7 @@ from openedx_wikilearn_features.wikimedia_general.tasks import (
 )
 
 logger = getLogger(__name__)
+User = get_user_model()
 
 
 @receiver(post_save, sender=CourseOverview)
@@ -157,3 +160,12 @@ def send_thread_mention_email_notification(sender, user, post, **kwargs):
         update_context_with_comment(context, post)
     message_context = build_discussion_notification_context(context)
     send_thread_mention_email_task.delay(post.body, message_context, is_thread)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def clear_cached_email_admin_user(sender, instance, **kwargs):
+    """
+    Stop sending notifications as a stale EMAIL_ADMIN user after that account changes.
+    """
+    clear_email_admin_user(instance)
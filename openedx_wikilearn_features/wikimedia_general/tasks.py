@@ -1,6 +1,5 @@
 from logging import getLogger
 
-import markdown
 from celery import shared_task
 from celery_utils.logged_task import LoggedTask
 from django.contrib.auth.models import User
@@ -14,6 +13,7 @@ from openedx.core.djangoapps.content.course_overviews.models import CourseOvervi
 from openedx.core.djangoapps.theming.helpers import get_current_site
 
 from openedx_wikilearn_features.email.utils import (
+    render_markdown,
     send_thread_creation_email,
     send_thread_mention_email,
     update_context_with_thread,
@@ -28,12 +28,12 @@ from openedx_wikilearn_features.wikimedia_general.utils import (
 log = getLogger(__name__)
 
 
-@shared_task(base=LoggedTask)
+@shared_task(base=LoggedTask, ignore_result=True)
 def send_thread_mention_email_task(post_body, context, is_thread):
     log.info("Initiated task to send thread mention notifications.")
 
     # convert markdown post_body to html
-    processed_post_body = markdown.markdown(post_body)
+    processed_post_body = render_markdown(post_body)
 
     # Replace few chars to handle cases i.e "<h1>@username</h1>" or <h1>@username/n</h1> so it will be easy
     # to retrieve mentioned usernames as usernames will be in between '@' and ' ' characters in processed_post_body.
@@ -48,7 +48,7 @@ def send_thread_mention_email_task(post_body, context, is_thread):
         log.info("No user is tagged on thread/comment of discussion forum.")
 
 
-@shared_task(base=LoggedTask)
+@shared_task(base=LoggedTask, ignore_result=True)
 def send_thread_creation_email_task(contexts, is_thread, post_id):
     """
     Task to send email notifications for thread mentions in a discussion forum.
@@ -76,7 +76,7 @@ def send_thread_creation_email_task(contexts, is_thread, post_id):
         log.info("No user is tagged on thread/comment of discussion forum.")
 
 
-@shared_task(base=LoggedTask)
+@shared_task(base=LoggedTask, ignore_result=True)
 def send_weekly_digest_new_post_notification_to_instructors(threads):
     """
     Asynchronously sends email notifications to course instructors about new discussion posts created.
@@ -108,6 +108,7 @@ def send_weekly_digest_new_post_notification_to_instructors(threads):
     }
 
     thread_contexts = []
+    authors = User.objects.in_bulk({int(post.user_id) for post in threads if post.type == "thread"})
 
     for post in threads:
         if post.type != "thread":
@@ -122,10 +123,9 @@ def send_weekly_digest_new_post_notification_to_instructors(threads):
         data = post.to_dict()
 
         thread_context = {}
-        update_context_with_thread(thread_context, post)
+        update_context_with_thread(thread_context, post, authors)
 
-        user_id = thread_context["thread_author_id"]
-        user = User.objects.get(id=user_id)
+        user = authors[thread_context["thread_author_id"]]
         log.info("User object is: %s", user)
         add_courseware_info(data, user, current_site, course_key)
 
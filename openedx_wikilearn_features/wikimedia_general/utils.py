@@ -16,7 +16,7 @@ from common.djangoapps.student.views import (
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from django.http import Http404
 from django.test import RequestFactory
 from lms.djangoapps.certificates.models import CertificateStatuses, GeneratedCertificate
@@ -174,6 +174,19 @@ def get_course_completion_date(user, course_key):
     return None
 
 
+def get_course_completion_dates(enrollments):
+    """
+    Bulk version of `get_course_completion_date` for the users and courses of the `enrollments` queryset.
+
+    Returns a dict mapping (user_id, course_key) to the creation date of the user's passing certificate.
+    """
+    certificates = GeneratedCertificate.eligible_certificates.filter(
+        Exists(enrollments.filter(user_id=OuterRef("user_id"), course_id=OuterRef("course_id"))),
+        status__in=CertificateStatuses.PASSED_STATUSES,
+    ).values_list("user_id", "course_id", "created_date")
+    return {(user_id, course_key): created_date for user_id, course_key, created_date in certificates.iterator()}
+
+
 def is_course_completed(user, course_key):
     """
     Returns whether the user has completed the course. If there is a problem while getting the grade, returns False.
@@ -274,18 +287,21 @@ def get_course_enrollment_and_completion_stats(course_id) -> dict:
     # Lazy import to avoid circular import
     CourseEnrollment = apps.get_model('student', 'CourseEnrollment')
 
-    enrollments = CourseEnrollment.objects.filter(course_id=course_id, is_active=True)
+    enrollments = CourseEnrollment.objects.filter(course_id=course_id, is_active=True).select_related("user")
+    certificate_user_ids = set(
+        GeneratedCertificate.objects.filter(course_id=course_id).values_list("user_id", flat=True)
+    )
 
+    enrollment_count = 0
     total_learners_completed = 0
     total_cert_generated = 0
     for enrollment in enrollments:
-        user = User.objects.get(id=enrollment.user_id)
-        if is_course_completed(user, course_id):
+        enrollment_count += 1
+        if is_course_completed(enrollment.user, course_id):
             total_learners_completed += 1
-        if is_certificate_generated(user, course_id):
+        if enrollment.user_id in certificate_user_ids:
             total_cert_generated += 1
 
-    enrollment_count = enrollments.count()
     completed_percentage = (total_learners_completed / enrollment_count) * 100 if enrollment_count else 0
 
     return {